@@ -1,14 +1,27 @@
+import sqlite3
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from config import config
+from app.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 
 
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite enforces foreign keys (and ON DELETE CASCADE) only when asked"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
 def create_app(config_name='default'):
     """Application factory pattern"""
     app = Flask(__name__)
@@ -19,13 +32,25 @@ def create_app(config_name='default'):
     login_manager.init_app(app)
     migrate.init_app(app, db)
     
+    # Route read-only requests to the replica bind, if configured
+    from app import replica
+    replica.init_app(app, db)
+    
+    # Template fragment and bytecode caches
+    from app import cache
+    cache.init_app(app)
+    
+    # Opt-in per-request profiling
+    from app import profiling
+    profiling.init_app(app)
+    
     # Configure login manager
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
     # Register blueprints
-    from app.routes import main, auth, products, categories, suppliers, stock, reports
+    from app.routes import main, auth, products, categories, suppliers, stock, reports, changes, admin
     
     app.register_blueprint(main.bp)
     app.register_blueprint(auth.bp)
@@ -34,6 +59,12 @@ def create_app(config_name='default'):
     app.register_blueprint(suppliers.bp)
     app.register_blueprint(stock.bp)
     app.register_blueprint(reports.bp)
+    app.register_blueprint(changes.bp)
+    app.register_blueprint(admin.bp)
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Create database tables
     with app.app_context():
@@ -51,5 +82,20 @@ def create_app(config_name='default'):
             admin.set_password('admin123')
             db.session.add(admin)
             db.session.commit()
+        
+        if app.config['REPLICA_COPY_PRIMARY']:
+            replica.copy_primary(db)
+    
+    # Record data changes in the outbox for downstream sync
+    from app import outbox
+    outbox.init_app(app)
+    
+    # Push product and stock changes to live dashboards
+    from app import events
+    events.init_app(app)
+    
+    # Load the SKU index used by barcode scans
+    from app import sku_index
+    sku_index.init_app(app)
     
     return app
@@ -0,0 +1,70 @@
+"""Set-based bulk updates of product prices and thresholds"""
+import json
+import re
+from datetime import datetime
+from sqlalchemy import func, case, cast, Integer
+from app import db
+from app.models import Product, BulkUpdate
+from app.outbox import record_bulk_change
+
+FIELDS = {'unit_price': 'Unit Price', 'min_quantity': 'Minimum Quantity'}
+MODES = {'percent': 'Percentage', 'absolute': 'Absolute amount'}
+
+
+def parse_skus(text):
+    """SKUs separated by commas, spaces or new lines"""
+    return [sku for sku in re.split(r'[\s,]+', text or '') if sku]
+
+
+def product_criteria(category_id=None, supplier_id=None, skus=None):
+    """Filter clauses selecting the products to update (all must match)"""
+    criteria = []
+    if category_id:
+        criteria.append(Product.category_id == category_id)
+    if supplier_id:
+        criteria.append(Product.supplier_id == supplier_id)
+    if skus:
+        criteria.append(Product.sku.in_(skus))
+    return criteria
+
+
+def new_value(field, mode, amount):
+    """SQL expression for the updated value, never below zero"""
+    column = getattr(Product, field)
+    value = column * (1 + amount / 100.0) if mode == 'percent' else column + amount
+    value = func.round(value, 2) if field == 'unit_price' else cast(func.round(value), Integer)
+    return case((value < 0, 0), else_=value)
+
+
+def preview(criteria, field, mode, amount, limit=10):
+    """Number of matching products and a sample of old and new values"""
+    count = Product.query.filter(*criteria).count()
+    sample = db.session.query(
+        Product.sku, Product.name, getattr(Product, field).label('old_value'),
+        new_value(field, mode, amount).label('new_value')
+    ).filter(*criteria).order_by(Product.name).limit(limit).all()
+    return count, sample
+
+
+def apply(criteria, field, mode, amount, user_id, description):
+    """Update every matching product with one UPDATE and record an audit entry"""
+    value = new_value(field, mode, amount)
+    values = {getattr(Product, field): value, Product.updated_at: datetime.utcnow()}
+    if field == 'unit_price':
+        # Expressions see the old row, so the new price is repeated here
+        values[Product.stock_value] = func.coalesce(Product.quantity, 0) * value
+    
+    affected = Product.query.filter(*criteria).update(values, synchronize_session=False)
+    record_bulk_change(Product, criteria, 'update')
+    
+    audit = BulkUpdate(
+        user_id=user_id,
+        field=field,
+        mode=mode,
+        amount=amount,
+        criteria=json.dumps(description),
+        products_affected=affected
+    )
+    db.session.add(audit)
+    db.session.commit()
+    return audit
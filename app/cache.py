@@ -0,0 +1,106 @@
+"""Template fragment cache invalidated by model writes"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from sqlalchemy import func
+from app import db
+from app.models import ChangeEvent
+
+
+class FragmentCache:
+    """Size-bounded LRU of rendered fragments with a TTL.
+    
+    Fragments are keyed by name plus the newest change feed id of each
+    table they depend on. The feed row is committed with the write, so a
+    write from any worker changes the key of every fragment built from
+    that table, and the stale entries age out of the LRU.
+    """
+    
+    def __init__(self, maxsize=128, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def table_versions(tables):
+    """Newest change feed id of each table (0 before its first change).
+    
+    Read through the request's session, so a replica-routed page gets the
+    versions of the data the replica has.
+    """
+    versions = db.session.execute(db.select(*[
+        db.select(func.max(ChangeEvent.id)).where(ChangeEvent.entity == table).scalar_subquery()
+        for table in tables
+    ])).one()
+    return tuple((table, version or 0) for table, version in zip(tables, versions))
+
+
+class FragmentCacheExtension(Extension):
+    """Cache a template block until one of its tables is written:
+    
+        {% cache 'top_products', 'products', 'categories' %}...{% endcache %}
+    
+    The tables must be recorded in the change feed, and the block must run
+    its own queries, so they read data at least as new as the key.
+    """
+    tags = {'cache'}
+    
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(args)]),
+                               [], [], body).set_lineno(lineno)
+    
+    def _render(self, args, caller):
+        key = (args[0],) + table_versions(args[1:])
+        rv = fragment_cache.get(key)
+        if rv is None:
+            rv = caller()
+            fragment_cache.set(key, rv)
+        return rv
+
+
+def init_app(app):
+    """Install the fragment cache and the Jinja bytecode cache"""
+    fragment_cache.maxsize = app.config['FRAGMENT_CACHE_SIZE']
+    fragment_cache.ttl = app.config['FRAGMENT_CACHE_TTL']
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    
+    # Compiled templates persist on disk so new workers skip compilation
+    bytecode_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if bytecode_dir:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from app import create_app, db, query_plans
+from app.models import User, ReconciliationRun, ChangeEvent
+from app.reconciliation import find_discrepancies, products_to_check, correct
+from app.outbox import settled_changes
+from config import TestingConfig
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', '-v', is_flag=True, help='Print the plan of every statement.')
+def check_query_plans(verbose):
+    """Fail if a route's SQL scans a full table without an accepted reason.
+    
+    Runs every route against a freshly seeded testing database (SQLite)
+    and checks EXPLAIN QUERY PLAN of each statement it issued.
+    """
+    remove_sqlite_files(TestingConfig)
+    try:
+        findings, unreached, missing_templates = query_plans.check(create_app('testing'))
+    finally:
+        remove_sqlite_files(TestingConfig)
+    
+    for finding in findings:
+        if finding.failed or verbose:
+            statement = ' '.join(finding.statement.split())
+            click.echo(f"{'FAIL' if finding.failed else 'ok  '}  {finding.endpoint}: {statement}")
+            click.echo(f"      {'; '.join(finding.plan)}")
+    for method, url, template in missing_templates:
+        click.echo(f'warning: {method} {url} has no template {template}; '
+                   'queries issued while rendering are not checked')
+    for endpoint in unreached:
+        click.echo(f'FAIL  {endpoint}: no request in ROUTE_REQUESTS reaches it')
+    
+    failures = sum(finding.failed for finding in findings) + len(unreached)
+    click.echo(f'{len(findings)} statements checked, {failures} failures')
+    if failures:
+        raise click.ClickException(f'{failures} route queries scan a full table or are unchecked')
+
+
+def remove_sqlite_files(config_class):
+    """Delete the SQLite files of a configuration"""
+    uris = [config_class.SQLALCHEMY_DATABASE_URI] + list(config_class.SQLALCHEMY_BINDS.values())
+    for uri in uris:
+        if uri.startswith('sqlite:///'):
+            path = uri[len('sqlite:///'):]
+            if os.path.exists(path):
+                os.remove(path)
+
+
+@click.command('reconcile-stock')
+@click.option('--full', is_flag=True, help='Check every product, not only those touched since the last run.')
+@click.option('--fix', is_flag=True, help='Post balancing transactions for discrepancies.')
+@click.option('--user', 'username', default='admin', show_default=True,
+              help='User recorded on balancing transactions.')
+@click.option('--chunk-size', default=500, show_default=True, help='Products per grouped query.')
+@with_appcontext
+def reconcile_stock(full, fix, username, chunk_size):
+    """Compare product quantities with their stock ledger"""
+    user = User.query.filter_by(username=username).first()
+    if fix and user is None:
+        raise click.ClickException(f'Unknown user "{username}"')
+    
+    last_run = None if full else ReconciliationRun.query.filter(
+        ReconciliationRun.finished_at.isnot(None)
+    ).order_by(ReconciliationRun.started_at.desc()).first()
+    since = last_run.started_at if last_run else None
+    run = ReconciliationRun(started_at=datetime.utcnow(), incremental=since is not None,
+                            products_checked=0, discrepancies=0, corrected=0)
+    # Discrepancies left unfixed by the last run are checked again
+    product_ids = products_to_check(since, last_run.unresolved_ids) if last_run else None
+    unresolved = []
+    
+    click.echo(f'Checking products touched since {since:%Y-%m-%d %H:%M:%S}' if since
+               else 'Checking all products')
+    for checked, discrepancies in find_discrepancies(product_ids, chunk_size):
+        run.products_checked += checked
+        run.discrepancies += len(discrepancies)
+        for d in discrepancies:
+            click.echo(f'{d.sku:<20} {d.name[:30]:<30} on hand {d.quantity:>8}  ledger {d.ledger:>8}  '
+                       f'diff {d.quantity - d.ledger:>+8}')
+            if fix:
+                correct(d, user.id)
+                run.corrected += 1
+            else:
+                unresolved.append(d.product_id)
+        if fix:
+            db.session.commit()
+    
+    run.unresolved = json.dumps(unresolved)
+    run.finished_at = datetime.utcnow()
+    db.session.add(run)
+    db.session.commit()
+    click.echo(f'{run.products_checked} products checked, {run.discrepancies} discrepancies, '
+               f'{run.corrected} corrected')
+
+
+changes_cli = AppGroup('changes', help='Change feed (outbox) commands.')
+
+
+@changes_cli.command('tail')
+@click.option('--after', default=0, show_default=True, help='Cursor to start after.')
+@click.option('--follow', is_flag=True, help='Keep polling for new changes.')
+@click.option('--interval', default=2.0, show_default=True, help='Seconds between polls.')
+def tail_changes(after, follow, interval):
+    """Print changes after a cursor as JSON lines"""
+    page_size = current_app.config['CHANGE_FEED_PAGE_SIZE']
+    while True:
+        changes = settled_changes(after, page_size)
+        for change in changes:
+            click.echo(json.dumps(change.to_dict()))
+            after = change.id
+        db.session.remove()
+        if len(changes) < page_size:
+            if not follow:
+                break
+            time.sleep(interval)
+
+
+@changes_cli.command('prune')
+@click.option('--days', type=int, help='Keep this many days (default CHANGE_FEED_RETENTION_DAYS).')
+def prune_changes(days):
+    """Delete changes older than the retention period"""
+    days = current_app.config['CHANGE_FEED_RETENTION_DAYS'] if days is None else days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = ChangeEvent.query.filter(ChangeEvent.created_at < cutoff).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    click.echo(f'Deleted {deleted} changes older than {days} days')
+
+
+def register_commands(app):
+    """Register CLI commands with the application"""
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(reconcile_stock)
+    app.cli.add_command(changes_cli)
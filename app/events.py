@@ -0,0 +1,177 @@
+"""Server-sent events feed for live dashboard updates"""
+import json
+import queue
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, func, case, desc
+from app import db
+from app.models import Product, StockTransaction
+
+
+class ChangeFeed:
+    """Fans out each published event to every connected client"""
+    
+    def __init__(self, backlog=100):
+        self.backlog = backlog
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.backlog)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+    
+    def __len__(self):
+        return len(self._subscribers)
+    
+    def publish(self, event, data):
+        message = f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Drop events for clients that stopped reading
+                pass
+    
+    def stream(self, keepalive=15):
+        """Yield events for one client until it disconnects"""
+        subscriber = self.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(subscriber)
+
+
+class SnapshotPublisher:
+    """Publishes one dashboard snapshot per burst of commits.
+    
+    Commits only wake a background thread, so writes never wait on the
+    snapshot queries, and commits that land while it waits share one.
+    """
+    
+    def __init__(self, feed):
+        self.feed = feed
+        self._pending = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+    
+    def notify(self, app):
+        with self._lock:
+            self._app = app
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='dashboard-publisher', daemon=True)
+                self._thread.start()
+        self._pending.set()
+    
+    def _run(self):
+        while True:
+            self._pending.wait()
+            app = self._app
+            time.sleep(app.config['DASHBOARD_PUBLISH_INTERVAL'])
+            # Commits after this point wake the next round
+            self._pending.clear()
+            if not self.feed:
+                continue
+            try:
+                with app.app_context(), db.engine.connect() as conn:
+                    snapshot = dashboard_snapshot(conn)
+                self.feed.publish('stock', snapshot)
+            except Exception:
+                app.logger.exception('Could not publish a dashboard update')
+
+
+feed = ChangeFeed()
+publisher = SnapshotPublisher(feed)
+
+
+def dashboard_snapshot(conn):
+    """Dashboard statistics and lists that change when products or stock change"""
+    total_products, total_value, low_stock_count = conn.execute(db.select(
+        func.count(Product.id),
+        func.sum(Product.stock_value),
+        func.sum(case((Product.quantity <= Product.min_quantity, 1), else_=0))
+    )).one()
+    low_stock = conn.execute(db.select(
+        Product.id, Product.name, Product.sku, Product.quantity, Product.min_quantity
+    ).where(Product.quantity <= Product.min_quantity).order_by(Product.quantity).limit(10))
+    transactions = conn.execute(db.select(
+        Product.name, StockTransaction.transaction_type, StockTransaction.quantity,
+        StockTransaction.transaction_date
+    ).join(Product, StockTransaction.product_id == Product.id).order_by(
+        desc(StockTransaction.transaction_date)
+    ).limit(10))
+    return {
+        'totals': {
+            'total_products': total_products,
+            'total_value': total_value or 0,
+            'low_stock_count': low_stock_count or 0
+        },
+        'low_stock': [
+            {'id': id, 'name': name, 'sku': sku, 'quantity': quantity, 'min_quantity': min_quantity}
+            for id, name, sku, quantity, min_quantity in low_stock
+        ],
+        'transactions': [
+            {'product': name, 'type': type, 'quantity': quantity,
+             'date': date.strftime('%Y-%m-%d %H:%M')}
+            for name, type, quantity, date in transactions
+        ]
+    }
+
+
+def _record_flush(session, flush_context):
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, (Product, StockTransaction)):
+            session.info['dashboard_changed'] = True
+            return
+
+
+def _record_bulk(orm_execute_state):
+    # Set-based writes (bulk updates and deletes) bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in (Product, StockTransaction):
+            orm_execute_state.session.info['dashboard_changed'] = True
+
+
+def _publish(session):
+    if not session.info.pop('dashboard_changed', False):
+        return
+    # Skip the queries when no dashboard is listening
+    if not feed:
+        return
+    try:
+        publisher.notify(current_app._get_current_object())
+    except Exception:
+        # The write is already committed; a missed update must not fail it
+        current_app.logger.exception('Could not schedule a dashboard update')
+
+
+def _discard(session):
+    session.info.pop('dashboard_changed', None)
+
+
+def init_app(app):
+    """Publish dashboard changes whenever products or stock are committed"""
+    listeners = [
+        ('after_flush', _record_flush),
+        ('do_orm_execute', _record_bulk),
+        ('after_commit', _publish),
+        ('after_rollback', _discard),
+    ]
+    for name, listener in listeners:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, BooleanField, TextAreaField, IntegerField, FloatField, SelectField, HiddenField
-from wtforms.validators import DataRequired, Email, EqualTo, ValidationError, NumberRange, Length
+from wtforms import StringField, PasswordField, BooleanField, TextAreaField, IntegerField, FloatField, SelectField, HiddenField, SelectMultipleField
+from wtforms.validators import DataRequired, InputRequired, Email, EqualTo, ValidationError, NumberRange, Length
 from app.models import User, Product
 
 
@@ -81,3 +81,38 @@ class StockTransactionForm(FlaskForm):
         from app.models import Product
         self.product.choices = [(p.id, f'{p.name} ({p.sku})') 
                                for p in Product.query.order_by(Product.name).all()]
+
+
+class BulkDeleteForm(FlaskForm):
+    """Bulk delete form; the product list's checkboxes submit the ids"""
+    ids = SelectMultipleField('Products', coerce=int, validate_choice=False)
+
+
+class BulkUpdateForm(FlaskForm):
+    """Bulk price and threshold update form"""
+    category = SelectField('Category', coerce=int)
+    supplier = SelectField('Supplier', coerce=int)
+    skus = TextAreaField('SKUs')
+    field = SelectField('Field', choices=[('unit_price', 'Unit Price'),
+                                          ('min_quantity', 'Minimum Quantity')])
+    mode = SelectField('Change', choices=[('percent', 'Percentage (%)'),
+                                          ('absolute', 'Absolute amount')])
+    amount = FloatField('Amount', validators=[InputRequired()])
+    
+    def __init__(self, *args, **kwargs):
+        super(BulkUpdateForm, self).__init__(*args, **kwargs)
+        from app.models import Category, Supplier
+        self.category.choices = [(0, '-- Any Category --')] + [
+            (c.id, c.name) for c in Category.query.order_by(Category.name).all()
+        ]
+        self.supplier.choices = [(0, '-- Any Supplier --')] + [
+            (s.id, s.name) for s in Supplier.query.order_by(Supplier.name).all()
+        ]
+    
+    def validate(self, extra_validators=None):
+        if not super(BulkUpdateForm, self).validate(extra_validators):
+            return False
+        if not (self.category.data or self.supplier.data or (self.skus.data or '').strip()):
+            self.skus.errors.append('Select a category, a supplier or enter SKUs.')
+            return False
+        return True
@@ -1,6 +1,8 @@
+import json
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from sqlalchemy import event
 from app import db, login_manager
 
 
@@ -76,14 +78,23 @@ class Product(db.Model):
     quantity = db.Column(db.Integer, default=0)
     min_quantity = db.Column(db.Integer, default=10)
     unit_price = db.Column(db.Float, nullable=False)
+    stock_value = db.Column(db.Float, default=0, index=True)  # quantity * unit_price
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'))
     supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Indexes (category/supplier filters ordered by name, delete guards)
+    __table_args__ = (
+        db.Index('ix_products_category_id_name', 'category_id', 'name'),
+        db.Index('ix_products_supplier_id_name', 'supplier_id', 'name'),
+    )
+    
     # Relationships
+    # Transactions are deleted by the database (ON DELETE CASCADE), not
+    # loaded into the session one by one
     transactions = db.relationship('StockTransaction', backref='product', lazy='dynamic', 
-                                   cascade='all, delete-orphan')
+                                   cascade='all, delete-orphan', passive_deletes=True)
     
     @property
     def is_low_stock(self):
@@ -91,27 +102,119 @@ class Product(db.Model):
     
     @property
     def total_value(self):
-        return self.quantity * self.unit_price
+        if self.stock_value is None:
+            return self.quantity * self.unit_price
+        return self.stock_value
     
     def __repr__(self):
         return f'<Product {self.name}>'
 
 
+@event.listens_for(Product, 'before_insert')
+@event.listens_for(Product, 'before_update')
+def update_stock_value(mapper, connection, target):
+    """Keep the stored stock value in step with quantity and price"""
+    target.stock_value = (target.quantity or 0) * (target.unit_price or 0)
+
+
 class StockTransaction(db.Model):
     """Stock transaction model for tracking inventory movements"""
     __tablename__ = 'stock_transactions'
     
     id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id', ondelete='CASCADE'),
+                           nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     transaction_type = db.Column(db.String(10), nullable=False)  # 'IN' or 'OUT'
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float)
     notes = db.Column(db.Text)
     transaction_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    # Indexes (per-product history ordered by date)
+    __table_args__ = (
+        db.Index('ix_stock_transactions_product_id_transaction_date',
+                 'product_id', 'transaction_date'),
+    )
+    
     # Relationships
     user = db.relationship('User', backref='transactions')
     
     def __repr__(self):
         return f'<StockTransaction {self.transaction_type} {self.quantity}>'
+
+
+class ReconciliationRun(db.Model):
+    """Ledger-vs-quantity reconciliation run"""
+    __tablename__ = 'reconciliation_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    incremental = db.Column(db.Boolean, default=False)
+    products_checked = db.Column(db.Integer, default=0)
+    discrepancies = db.Column(db.Integer, default=0)
+    corrected = db.Column(db.Integer, default=0)
+    unresolved = db.Column(db.Text)  # JSON list of product ids left uncorrected
+    
+    @property
+    def unresolved_ids(self):
+        return json.loads(self.unresolved) if self.unresolved else []
+    
+    def __repr__(self):
+        return f'<ReconciliationRun {self.started_at}>'
+
+
+class ChangeEvent(db.Model):
+    """Outbox of data changes for incremental downstream sync"""
+    __tablename__ = 'change_events'
+    __table_args__ = (
+        # Newest change per table, read as the fragment cache version
+        db.Index('ix_change_events_entity_id', 'entity', 'id'),
+        # Pruning can empty the table; never hand out an id a consumer has seen
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)  # Cursor for consumers
+    entity = db.Column(db.String(32), nullable=False)  # Table name
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # 'insert', 'update' or 'delete'
+    payload = db.Column(db.Text)  # JSON row after the change
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'operation': self.operation,
+            'data': json.loads(self.payload) if self.payload else None,
+            'created_at': self.created_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<ChangeEvent {self.operation} {self.entity} {self.entity_id}>'
+
+
+class BulkUpdate(db.Model):
+    """Audit record of a set-based product update"""
+    __tablename__ = 'bulk_updates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    field = db.Column(db.String(20), nullable=False)  # 'unit_price' or 'min_quantity'
+    mode = db.Column(db.String(10), nullable=False)  # 'percent' or 'absolute'
+    amount = db.Column(db.Float, nullable=False)
+    criteria = db.Column(db.Text)  # JSON of the category, supplier and SKU filters
+    products_affected = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # Relationships
+    user = db.relationship('User')
+    
+    @property
+    def criteria_dict(self):
+        return json.loads(self.criteria) if self.criteria else {}
+    
+    def __repr__(self):
+        return f'<BulkUpdate {self.field} {self.mode} {self.amount}>'
@@ -0,0 +1,147 @@
+"""Change outbox written in the same transaction as the data it describes"""
+import json
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, inspect, insert, literal, func, cast, null, Text, DateTime
+from app import db
+from app.models import Product, Category, Supplier, StockTransaction, ChangeEvent
+
+TRACKED = (Product, Category, Supplier, StockTransaction)
+
+
+def _json_default(value):
+    # Same format as _iso_datetime renders in SQL
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='microseconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def row_payload(obj):
+    """JSON of the object's column values"""
+    state = inspect(obj)
+    values = {attr.key: state.dict.get(attr.key) for attr in state.mapper.column_attrs}
+    return json.dumps(values, default=_json_default)
+
+
+def _iso_datetime(column, dialect):
+    """SQL rendering of a DateTime column matching _json_default"""
+    if dialect == 'postgresql':
+        return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+    if dialect == 'mysql':
+        return func.date_format(column, '%Y-%m-%dT%H:%i:%s.%f')
+    if dialect == 'sqlite':
+        # Stored as "YYYY-MM-DD HH:MM:SS.ffffff"
+        return func.replace(column, ' ', 'T')
+    return column
+
+
+def _json_row(model):
+    """SQL expression rendering a row of the model as a JSON object"""
+    dialect = db.engine.dialect.name
+    pairs = []
+    for column in model.__table__.columns:
+        value = _iso_datetime(column, dialect) if isinstance(column.type, DateTime) else column
+        pairs.extend([literal(column.name), value])
+    if dialect == 'postgresql':
+        return cast(func.json_build_object(*pairs), Text)
+    if dialect in ('sqlite', 'mysql'):
+        return cast(func.json_object(*pairs), Text)
+    return null()
+
+
+def _cascaded(model):
+    # Tracked children the database deletes with ON DELETE CASCADE
+    for rel in inspect(model).relationships:
+        if rel.passive_deletes and 'delete' in rel.cascade and rel.mapper.class_ in TRACKED:
+            yield rel
+
+
+def record_bulk_change(model, criteria, operation):
+    """Add outbox rows for a set-based write with one INSERT ... SELECT.
+    
+    Call it before a bulk DELETE (the rows must still exist) and after a
+    bulk UPDATE, in the same transaction. Deletes also record the child
+    rows removed by ON DELETE CASCADE.
+    """
+    if operation == 'delete':
+        for rel in _cascaded(model):
+            local, remote = rel.local_remote_pairs[0]
+            parents = db.select(local).where(*criteria)
+            record_bulk_change(rel.mapper.class_, [remote.in_(parents)], 'delete')
+    
+    rows = db.select(
+        literal(model.__tablename__), model.id, literal(operation),
+        _json_row(model), literal(datetime.utcnow())
+    ).where(*criteria)
+    db.session.execute(insert(ChangeEvent).from_select(
+        ['entity', 'entity_id', 'operation', 'payload', 'created_at'], rows
+    ))
+
+
+def _load_columns(session, flush_context, instances):
+    # Load expired columns of changed rows before the flush, so the payload
+    # can be built afterwards without emitting SQL mid-flush
+    for obj in session.dirty | session.deleted:
+        if isinstance(obj, TRACKED):
+            state = inspect(obj)
+            for key in state.unloaded & set(state.mapper.column_attrs.keys()):
+                getattr(obj, key)
+    
+    # Children removed by the database never reach the flush
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED):
+            model = type(obj)
+            for rel in _cascaded(model):
+                local, remote = rel.local_remote_pairs[0]
+                record_bulk_change(rel.mapper.class_, [remote == obj.id], 'delete')
+
+
+def _record_flush(session, flush_context):
+    changes = session.info.setdefault('outbox', [])
+    for operation, objects in (('insert', session.new), ('update', session.dirty),
+                               ('delete', session.deleted)):
+        for obj in objects:
+            if not isinstance(obj, TRACKED):
+                continue
+            if operation == 'update' and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.append(ChangeEvent(
+                entity=obj.__tablename__,
+                entity_id=obj.id,
+                operation=operation,
+                payload=row_payload(obj)
+            ))
+
+
+def _write_outbox(session, flush_context):
+    # Flushed by the commit that is already in progress
+    session.add_all(session.info.pop('outbox', ()))
+
+
+def settled_changes(after, limit):
+    """Changes after the cursor, oldest first.
+    
+    Entries younger than CHANGE_FEED_SETTLE_SECONDS are held back so a
+    transaction that took a lower id but committed later is not skipped.
+    """
+    settled_before = datetime.utcnow() - timedelta(
+        seconds=current_app.config['CHANGE_FEED_SETTLE_SECONDS']
+    )
+    return ChangeEvent.query.filter(
+        ChangeEvent.id > after,
+        ChangeEvent.created_at <= settled_before
+    ).order_by(ChangeEvent.id).limit(limit).all()
+
+
+def init_app(app):
+    """Record product, category, supplier and stock writes in the outbox"""
+    listeners = [
+        ('before_flush', _load_columns),
+        ('after_flush', _record_flush),
+        ('after_flush_postexec', _write_outbox),
+    ]
+    for name, listener in listeners:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
@@ -0,0 +1,233 @@
+"""Opt-in per-request memory (tracemalloc) and sampling CPU profiling"""
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+from flask_login import current_user
+
+# tracemalloc is process-wide, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+# Frames from these files say nothing about the request
+_IGNORED_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>', '<unknown>')
+
+# Allocations are reported at the innermost frame in the application
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class Sampler(threading.Thread):
+    """Polls traced memory and, with cpu, samples one thread's stack.
+    
+    Whenever traced memory reaches a new high at least snapshot_step bytes
+    above the last snapshot, it takes another, so the report shows what
+    was live near the peak rather than what the request kept.
+    """
+    
+    def __init__(self, thread_id, interval, snapshot_step, cpu=False):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.snapshot_step = snapshot_step
+        self.cpu = cpu
+        self.snapshot = None
+        self.snapshot_bytes = 0
+        self.samples = 0
+        self.own = Counter()
+        self.cumulative = Counter()
+        self._next_snapshot = tracemalloc.get_traced_memory()[0] + snapshot_step
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._poll_memory()
+            if self.cpu:
+                self._sample_stack()
+    
+    def _poll_memory(self):
+        current = tracemalloc.get_traced_memory()[0]
+        if current >= self._next_snapshot:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_bytes = current
+            self._next_snapshot = current + self.snapshot_step
+    
+    def _sample_stack(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        self.samples += 1
+        self.own[_describe(frame)] += 1
+        seen = set()
+        while frame is not None:
+            site = _describe(frame)
+            if site not in seen:
+                seen.add(site)
+                self.cumulative[site] += 1
+            frame = frame.f_back
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _describe(frame):
+    code = frame.f_code
+    return f'{code.co_filename}:{code.co_firstlineno} ({code.co_name})'
+
+
+def _allocation_sites(snapshot, top):
+    """Largest allocation sites, each at its innermost application frame"""
+    sizes = Counter()
+    counts = Counter()
+    for stat in snapshot.statistics('traceback'):
+        # Frames are ordered oldest first
+        frames = stat.traceback
+        # Skips the sampler thread's own allocations too
+        if frames[-1].filename in _IGNORED_FILES or any(frame.filename == __file__ for frame in frames):
+            continue
+        # Library code is reported only when no application frame was captured
+        site = next((frame for frame in reversed(frames) if frame.filename.startswith(_APP_DIR)), frames[-1])
+        sizes[str(site)] += stat.size
+        counts[str(site)] += stat.count
+    return [{'site': site, 'size': size, 'count': counts[site]} for site, size in sizes.most_common(top)]
+
+
+def _wants_profile():
+    if request.endpoint in (None, 'static', 'main.dashboard_stream'):
+        return False
+    if current_app.config['PROFILING_ENABLED']:
+        return True
+    return (request.headers.get(current_app.config['PROFILING_HEADER']) == '1'
+            and current_user.is_authenticated and current_user.is_admin)
+
+
+def _start_profile():
+    if not _wants_profile() or not _profile_lock.acquire(blocking=False):
+        return
+    
+    g.profile = {'started_at': datetime.utcnow(), 'start': time.perf_counter()}
+    g.profile['started_tracing'] = not tracemalloc.is_tracing()
+    if g.profile['started_tracing']:
+        tracemalloc.start(current_app.config['PROFILING_TRACEBACK_DEPTH'])
+    tracemalloc.reset_peak()
+    g.profile['baseline'] = tracemalloc.get_traced_memory()[0]
+    
+    cpu = current_app.config['PROFILING_CPU']
+    interval = current_app.config['PROFILING_CPU_INTERVAL' if cpu else 'PROFILING_MEMORY_INTERVAL']
+    sampler = Sampler(threading.get_ident(), interval, current_app.config['PROFILING_SNAPSHOT_STEP'], cpu)
+    sampler.start()
+    g.profile['sampler'] = sampler
+
+
+def _record_status(response):
+    if 'profile' in g:
+        g.profile['status'] = response.status_code
+    return response
+
+
+def _finish_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return
+    sampler = profile['sampler']
+    try:
+        duration = time.perf_counter() - profile['start']
+        sampler.stop()
+        # Process-wide: includes what other threads allocated meanwhile
+        current, peak = tracemalloc.get_traced_memory()
+        # Requests that never grew by a snapshot step report what is left
+        if sampler.snapshot is not None:
+            snapshot, allocations_at = sampler.snapshot, sampler.snapshot_bytes - profile['baseline']
+        else:
+            snapshot, allocations_at = tracemalloc.take_snapshot(), current - profile['baseline']
+        # Reading the snapshot allocates a lot; do not trace that as well
+        if profile['started_tracing']:
+            tracemalloc.stop()
+        
+        top = current_app.config['PROFILING_TOP_SITES']
+        report = {
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': profile.get('status', 500),
+            'user': current_user.username if current_user.is_authenticated else None,
+            'started_at': profile['started_at'].isoformat(),
+            'duration_ms': round(duration * 1000, 2),
+            'peak_bytes': peak - profile['baseline'],
+            'retained_bytes': current - profile['baseline'],
+            'allocations_at_bytes': allocations_at,
+            'allocations': _allocation_sites(snapshot, top)
+        }
+        if sampler.cpu:
+            report['cpu'] = {
+                'interval_ms': sampler.interval * 1000,
+                'samples': sampler.samples,
+                'own': sampler.own.most_common(top),
+                'cumulative': sampler.cumulative.most_common(top)
+            }
+        _write_report(report)
+    finally:
+        if sampler.is_alive():
+            sampler.stop()
+        if profile['started_tracing'] and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _profile_lock.release()
+
+
+def _write_report(report):
+    directory = current_app.config['PROFILING_DIR']
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')
+    name = f"{stamp}-{report['endpoint'].replace('.', '-')}.json"
+    with open(os.path.join(directory, name), 'w') as f:
+        json.dump(report, f, indent=2)
+    _prune_reports(directory, current_app.config['PROFILING_MAX_REPORTS'])
+
+
+def _prune_reports(directory, keep):
+    # Names start with a timestamp, so they sort oldest first
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in names[:max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def load_reports(limit=100):
+    """Most recent profile reports, newest first"""
+    directory = current_app.config['PROFILING_DIR']
+    if not os.path.isdir(directory):
+        return []
+    reports = []
+    for name in sorted(os.listdir(directory), reverse=True)[:limit]:
+        report = load_report(name)
+        if report is not None:
+            reports.append(report)
+    return reports
+
+
+def load_report(name):
+    """A single report by file name, or None"""
+    if os.path.basename(name) != name or not name.endswith('.json'):
+        return None
+    path = os.path.join(current_app.config['PROFILING_DIR'], name)
+    try:
+        with open(path) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    report['name'] = name
+    return report
+
+
+def init_app(app):
+    """Install the profiling request hooks"""
+    app.before_request(_start_profile)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_profile)
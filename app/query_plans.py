@@ -0,0 +1,222 @@
+"""Query plans of the SQL each route issues against a seeded database"""
+import re
+from collections import namedtuple
+from flask import has_request_context, request
+from jinja2 import TemplateNotFound
+from sqlalchemy import event
+from app import db, replica
+from app.models import User, Category, Supplier, Product, StockTransaction
+
+# One request per route and variant. Every endpoint must appear here or in
+# UNCHECKED_ENDPOINTS, so a new route cannot skip the check.
+PRODUCT_FORM = {'name': 'Widget 1', 'sku': 'W-0001', 'quantity': 12, 'min_quantity': 5,
+                'unit_price': 4.5, 'category': 1, 'supplier': 1}
+ROUTE_REQUESTS = [
+    ('GET', '/auth/login', None),
+    ('GET', '/auth/register', None),
+    ('GET', '/', None),
+    ('GET', '/dashboard', None),
+    ('GET', '/products/', None),
+    ('GET', '/products/?search=Widget', None),
+    ('GET', '/products/?category=1&page=2', None),
+    ('GET', '/products/1', None),
+    ('GET', '/products/create', None),
+    ('POST', '/products/create', dict(PRODUCT_FORM, name='New', sku='NEW-1')),
+    ('GET', '/products/1/edit', None),
+    ('POST', '/products/1/edit', PRODUCT_FORM),
+    ('GET', '/products/low-stock', None),
+    ('GET', '/products/bulk-update', None),
+    ('POST', '/products/bulk-update', {'category': 1, 'supplier': 0, 'skus': '', 'field': 'unit_price',
+                                       'mode': 'percent', 'amount': 5, 'action': 'preview'}),
+    ('POST', '/products/bulk-update', {'category': 0, 'supplier': 1, 'skus': '', 'field': 'min_quantity',
+                                       'mode': 'absolute', 'amount': 1, 'action': 'apply'}),
+    ('POST', '/products/2/delete', None),
+    ('POST', '/products/bulk-delete', {'ids': [3, 4]}),
+    ('GET', '/categories/', None),
+    ('GET', '/categories/create', None),
+    ('POST', '/categories/create', {'name': 'New category'}),
+    ('GET', '/categories/1/edit', None),
+    ('POST', '/categories/1/delete', None),
+    ('POST', '/categories/3/delete', None),
+    ('GET', '/suppliers/', None),
+    ('GET', '/suppliers/1', None),
+    ('GET', '/suppliers/create', None),
+    ('POST', '/suppliers/create', {'name': 'New supplier', 'email': 'orders@example.com'}),
+    ('GET', '/suppliers/1/edit', None),
+    ('POST', '/suppliers/1/delete', None),
+    ('POST', '/suppliers/3/delete', None),
+    ('GET', '/stock/', None),
+    ('GET', '/stock/?product=1', None),
+    ('GET', '/stock/add', None),
+    ('POST', '/stock/add', {'product': 1, 'quantity': 3, 'unit_price': 4.5, 'notes': ''}),
+    ('GET', '/stock/remove', None),
+    ('POST', '/stock/remove', {'product': 1, 'quantity': 1, 'unit_price': 4.5, 'notes': ''}),
+    ('POST', '/stock/scan', {'json': {'sku': 'W-0005', 'type': 'IN'}}),
+    ('GET', '/reports/', None),
+    ('GET', '/reports/export/products', None),
+    ('GET', '/reports/export/transactions', None),
+    ('GET', '/changes/?after=0', None),
+    ('GET', '/admin/profiles', None),
+    ('GET', '/admin/profiles/missing.json', None),
+    ('GET', '/auth/logout', None),
+]
+UNCHECKED_ENDPOINTS = {
+    'static': 'serves files',
+    'main.dashboard_stream': 'streams forever; its totals query is main.dashboard\'s',
+}
+
+# Plan steps that read or sort a whole table (a SELECT without FROM scans
+# a "constant row")
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)|USE TEMP B-TREE')
+# Walking an index in order is fine when a LIMIT stops it early and no
+# WHERE clause can make it walk most of the index to fill the page
+ORDERED_SCAN = re.compile(r'^SCAN \w+ USING (COVERING )?INDEX ')
+
+# Scans accepted on purpose: (endpoint, pattern matched against the SQL, reason)
+ALLOWED_SCANS = [
+    (r'products\.index|stock\.index|main\.dashboard|reports\.index',
+     r'^SELECT count\(\*\) AS count_1\s+FROM \(SELECT (?:(?!\bWHERE\b).)*\) AS anon_1$',
+     'unfiltered counts read every row'),
+    (r'.*', r'FROM (categories|suppliers)\b(?!.*\bWHERE\b)',
+     'lists of categories and suppliers are small and read whole'),
+    (r'main\.dashboard|products\.low_stock|reports\.index', r'products\.quantity <= products\.min_quantity',
+     'compares two columns, which no index can answer'),
+    (r'products\.index', r'LIKE',
+     'substring search on name and SKU'),
+    (r'main\.dashboard|reports\.index', r'^SELECT sum\(products\.stock_value\) AS sum_1\s+FROM products$',
+     'total stock value over every product'),
+    (r'categories\.index|suppliers\.index|reports\.index', r'GROUP BY',
+     'per-category and per-supplier totals over every product'),
+    (r'stock\.(index|add|remove)', r'FROM products ORDER BY products\.name',
+     'product picker lists every product'),
+    (r'reports\.export_\w+', r'.',
+     'CSV exports read every row'),
+]
+
+# Filtered variants must look their rows up in these indexes:
+# (endpoint, pattern matched against the SQL, index)
+REQUIRED_INDEXES = [
+    (r'products\.index', r'WHERE products\.category_id = \?', 'ix_products_category_id_name'),
+    (r'suppliers\.view', r'WHERE products\.supplier_id = \?', 'ix_products_supplier_id_name'),
+    (r'stock\.index', r'WHERE stock_transactions\.product_id = \?',
+     'ix_stock_transactions_product_id_transaction_date'),
+]
+
+Finding = namedtuple('Finding', 'endpoint statement plan failed')
+
+
+def seed(products=30, transactions_per_product=3):
+    """Fill an empty database with enough rows for every route to render"""
+    admin = User.query.filter_by(username='admin').first()
+    categories = [Category(name=f'Category {i}') for i in range(1, 4)]
+    suppliers = [Supplier(name=f'Supplier {i}') for i in range(1, 4)]
+    db.session.add_all(categories + suppliers)
+    db.session.flush()
+    for i in range(1, products + 1):
+        product = Product(name=f'Widget {i}', sku=f'W-{i:04d}', quantity=transactions_per_product,
+                          min_quantity=5, unit_price=4.5,
+                          category_id=categories[i % 2].id, supplier_id=suppliers[i % 2].id)
+        db.session.add(product)
+        db.session.flush()
+        for _ in range(transactions_per_product):
+            db.session.add(StockTransaction(product_id=product.id, user_id=admin.id,
+                                            transaction_type='IN', quantity=1))
+    db.session.commit()
+    return admin
+
+
+def capture(app, client):
+    """Run ROUTE_REQUESTS and return the (endpoint, engine, statement,
+    parameters) they issued, and the requests whose template is missing.
+    
+    A view's own queries run before its template is looked up, so they are
+    captured even when the template is missing.
+    """
+    statements = []
+    missing_templates = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and not executemany:
+            statements.append((request.endpoint, conn.engine, statement, parameters))
+    
+    with app.app_context():
+        engines = set(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for method, url, data in ROUTE_REQUESTS:
+            try:
+                if data and 'json' in data:
+                    response = client.open(url, method=method, json=data['json'])
+                else:
+                    response = client.open(url, method=method, data=data)
+            except TemplateNotFound as e:
+                missing_templates.append((method, url, e.name))
+                continue
+            if response.status_code >= 500:
+                raise RuntimeError(f'{method} {url} returned {response.status_code}')
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+    return statements, missing_templates
+
+
+def unchecked_endpoints(app, statements):
+    """Endpoints that no request in ROUTE_REQUESTS reached"""
+    reached = {endpoint for endpoint, _, _, _ in statements}
+    return sorted(endpoint for endpoint in app.view_functions
+                  if endpoint not in reached and endpoint not in UNCHECKED_ENDPOINTS)
+
+
+def _allowed(endpoint, statement):
+    return any(re.match(route, endpoint or '') and re.search(pattern, statement, re.S)
+               for route, pattern, _ in ALLOWED_SCANS)
+
+
+def _missing_index(endpoint, statement, plan):
+    for route, pattern, index in REQUIRED_INDEXES:
+        if re.match(route, endpoint or '') and re.search(pattern, statement, re.S):
+            searched = re.compile(rf'^SEARCH \w+ USING (COVERING )?INDEX {index} ')
+            if not any(searched.match(step) for step in plan):
+                return True
+    return False
+
+
+def explain(statements):
+    """EXPLAIN QUERY PLAN each distinct statement and flag unaccepted scans
+    and filtered queries that do not search their index"""
+    findings = []
+    seen = set()
+    for endpoint, engine, statement, parameters in statements:
+        if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'INSERT')):
+            continue
+        if (endpoint, statement) in seen:
+            continue
+        seen.add((endpoint, statement))
+        with engine.connect() as conn:
+            plan = [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+        walks_page = re.search(r'\bLIMIT\b', statement) and not re.search(r'\bWHERE\b', statement)
+        bad = [step for step in plan if FULL_SCAN.search(step)
+               and not (walks_page and ORDERED_SCAN.match(step))]
+        failed = (bool(bad) and not _allowed(endpoint, statement)) or _missing_index(endpoint, statement, plan)
+        findings.append(Finding(endpoint, statement, plan, failed))
+    return findings
+
+
+def check(app):
+    """Seed the app's (empty) database, call every route and explain its SQL.
+    
+    Returns (findings, endpoints no request reached, requests whose
+    template is missing).
+    """
+    with app.app_context():
+        admin_id = seed().id
+        # Replica-routed pages must see the seeded rows too
+        if app.config['REPLICA_COPY_PRIMARY'] and replica.REPLICA in app.config['SQLALCHEMY_BINDS']:
+            replica.copy_primary(db)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin_id)
+    
+    statements, missing_templates = capture(app, client)
+    return explain(statements), unchecked_endpoints(app, statements), missing_templates
@@ -0,0 +1,76 @@
+"""Reconciliation of product quantities against the stock ledger"""
+from collections import namedtuple
+from sqlalchemy import func, case, union
+from app import db
+from app.models import Product, StockTransaction
+
+Discrepancy = namedtuple('Discrepancy', 'product_id sku name quantity ledger')
+
+
+def touched_since(since):
+    """Ids of products edited or moved since the given time"""
+    return union(
+        db.select(Product.id).where(Product.updated_at >= since),
+        db.select(StockTransaction.product_id).where(StockTransaction.transaction_date >= since)
+    )
+
+
+def products_to_check(since, carried=()):
+    """Ids touched since the given time plus those still unresolved, evaluated once"""
+    return set(db.session.scalars(touched_since(since))) | set(carried)
+
+
+def _product_chunks(product_ids, chunk_size):
+    query = db.session.query(Product.id, Product.sku, Product.name, Product.quantity)
+    if product_ids is None:
+        last_id = 0
+        while True:
+            chunk = query.filter(Product.id > last_id).order_by(Product.id).limit(chunk_size).all()
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1].id
+    else:
+        ids = sorted(product_ids)
+        for start in range(0, len(ids), chunk_size):
+            yield query.filter(Product.id.in_(ids[start:start + chunk_size])).order_by(Product.id).all()
+
+
+def find_discrepancies(product_ids=None, chunk_size=500):
+    """Yield (products checked, discrepancies) for each chunk of products.
+    
+    Products are walked in id order, chunk_size at a time, and the net of
+    IN minus OUT is summed per chunk in the database, so neither table is
+    loaded into memory. With product_ids, only those products are checked.
+    """
+    ledger_net = func.sum(case(
+        (StockTransaction.transaction_type == 'IN', StockTransaction.quantity),
+        else_=-StockTransaction.quantity
+    ))
+    
+    for chunk in _product_chunks(product_ids, chunk_size):
+        ids = [row.id for row in chunk]
+        net = dict(db.session.query(StockTransaction.product_id, ledger_net).filter(
+            StockTransaction.product_id.in_(ids)
+        ).group_by(StockTransaction.product_id).all())
+        
+        discrepancies = [
+            Discrepancy(row.id, row.sku, row.name, row.quantity or 0, net.get(row.id) or 0)
+            for row in chunk
+            if (net.get(row.id) or 0) != (row.quantity or 0)
+        ]
+        yield len(chunk), discrepancies
+
+
+def correct(discrepancy, user_id):
+    """Post a balancing transaction so the ledger matches the quantity on hand"""
+    difference = discrepancy.quantity - discrepancy.ledger
+    transaction = StockTransaction(
+        product_id=discrepancy.product_id,
+        user_id=user_id,
+        transaction_type='IN' if difference > 0 else 'OUT',
+        quantity=abs(difference),
+        notes=f'Reconciliation adjustment (ledger {discrepancy.ledger}, on hand {discrepancy.quantity})'
+    )
+    db.session.add(transaction)
+    return transaction
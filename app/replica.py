@@ -0,0 +1,90 @@
+"""Read/write splitting between the primary database and a read replica"""
+import time
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA = 'replica'
+
+
+def replica_read(view):
+    """Mark a view as read-only so its queries may be served by the replica"""
+    view.replica_read = True
+    return view
+
+
+class RoutingSession(Session):
+    """Session that sends reads of read-only requests to the replica bind"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _reads_from_replica(self, clause):
+        if not has_request_context() or not g.get('read_replica'):
+            return False
+        # Writes and anything issued after a write stay on the primary
+        if self._flushing or g.get('db_written') or getattr(clause, 'is_dml', False):
+            return False
+        return True
+
+
+def _route_request():
+    """Decide whether the current request may read from the replica"""
+    g.read_replica = False
+    if REPLICA not in current_app.config['SQLALCHEMY_BINDS']:
+        return
+    if request.method not in ('GET', 'HEAD'):
+        return
+    # Read-your-writes: a client that just wrote reads from the primary
+    # until the replica has had time to catch up
+    if time.time() < session.get('primary_until', 0):
+        return
+    view = current_app.view_functions.get(request.endpoint)
+    g.read_replica = (request.blueprint in current_app.config['REPLICA_BLUEPRINTS']
+                      or getattr(view, 'replica_read', False))
+
+
+def _mark_written():
+    if has_request_context():
+        g.db_written = True
+        if REPLICA in current_app.config['SQLALCHEMY_BINDS']:
+            session['primary_until'] = time.time() + current_app.config['REPLICA_MAX_LAG']
+
+
+def _record_write(db_session, flush_context):
+    _mark_written()
+
+
+def _record_bulk_write(orm_execute_state):
+    # Set-based INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written()
+
+
+def copy_primary(db):
+    """Copy the primary SQLite database over the replica.
+    
+    Stands in for replication when both binds are local SQLite files, as
+    in the testing configuration.
+    """
+    source = db.engines[None].raw_connection()
+    target = db.engines[REPLICA].raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        target.close()
+        source.close()
+
+
+def init_app(app, db):
+    """Install request routing and write tracking for the replica bind"""
+    app.before_request(_route_request)
+    listeners = [
+        ('after_flush', _record_write),
+        ('do_orm_execute', _record_bulk_write),
+    ]
+    for name, listener in listeners:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
@@ -9,3 +9,5 @@ from app.routes.categories import bp as categories_bp
 from app.routes.suppliers import bp as suppliers_bp
 from app.routes.stock import bp as stock_bp
 from app.routes.reports import bp as reports_bp
+from app.routes.changes import bp as changes_bp
+from app.routes.admin import bp as admin_bp
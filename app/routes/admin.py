@@ -0,0 +1,36 @@
+from functools import wraps
+from flask import Blueprint, render_template, abort
+from flask_login import login_required, current_user
+from app.profiling import load_reports, load_report
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+def admin_required(view):
+    """Restrict a view to admin users"""
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        if not current_user.is_admin:
+            abort(403)
+        return view(*args, **kwargs)
+    return decorated_view
+
+
+@bp.route('/profiles')
+@login_required
+@admin_required
+def profiles():
+    """Summary of recent request profiles"""
+    reports = load_reports()
+    return render_template('admin/profiles.html', reports=reports)
+
+
+@bp.route('/profiles/<name>')
+@login_required
+@admin_required
+def profile(name):
+    """Allocation sites and CPU samples of one request"""
+    report = load_report(name)
+    if report is None:
+        abort(404)
+    return render_template('admin/profile.html', report=report)
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required
+from sqlalchemy import func
 from app import db
-from app.models import Category
+from app.models import Category, Product
 from app.forms import CategoryForm
 
 bp = Blueprint('categories', __name__, url_prefix='/categories')
@@ -10,8 +11,14 @@ bp = Blueprint('categories', __name__, url_prefix='/categories')
 @bp.route('/')
 @login_required
 def index():
-    """List all categories"""
-    categories = Category.query.order_by(Category.name).all()
+    """List all categories with product count and stock value"""
+    categories = db.session.query(
+        Category,
+        func.count(Product.id).label('product_count'),
+        func.coalesce(func.sum(Product.quantity), 0).label('total_quantity'),
+        func.coalesce(func.sum(Product.stock_value), 0).label('total_value')
+    ).outerjoin(Product).group_by(Category.id).order_by(Category.name).all()
+    
     return render_template('categories/index.html', categories=categories)
 
 
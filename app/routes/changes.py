@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify, request, current_app
+from flask_login import login_required
+from app.outbox import settled_changes
+
+bp = Blueprint('changes', __name__, url_prefix='/changes')
+
+
+@bp.route('/')
+@login_required
+def index():
+    """Cursor-paginated feed of product, category, supplier and stock changes"""
+    after = request.args.get('after', 0, type=int)
+    limit = max(1, min(request.args.get('limit', 100, type=int), current_app.config['CHANGE_FEED_PAGE_SIZE']))
+    
+    changes = settled_changes(after, limit)
+    
+    return jsonify(
+        changes=[change.to_dict() for change in changes],
+        next_cursor=changes[-1].id if changes else after,
+        has_more=len(changes) == limit
+    )
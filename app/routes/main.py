@@ -1,7 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for
+from flask import Blueprint, Response, current_app, render_template, redirect, url_for
 from flask_login import login_required, current_user
 from app.models import Product, Category, Supplier, StockTransaction
 from app import db
+from app.replica import replica_read
+from app.events import feed
 from sqlalchemy import func, desc
 
 bp = Blueprint('main', __name__)
@@ -10,6 +12,7 @@ bp = Blueprint('main', __name__)
 @bp.route('/')
 @bp.route('/dashboard')
 @login_required
+@replica_read
 def dashboard():
     """Dashboard with overview statistics"""
     # Get statistics
@@ -22,23 +25,26 @@ def dashboard():
     
     # Calculate total inventory value
     total_value = db.session.query(
-        func.sum(Product.quantity * Product.unit_price)
+        func.sum(Product.stock_value)
     ).scalar() or 0
     
+    # The lists below are run by the template only when its cached
+    # fragment is missing or stale
+    
     # Get low stock products
     low_stock_products = Product.query.filter(
         Product.quantity <= Product.min_quantity
-    ).order_by(Product.quantity).limit(10).all()
+    ).order_by(Product.quantity).limit(10)
     
     # Get recent transactions
     recent_transactions = StockTransaction.query.order_by(
         desc(StockTransaction.transaction_date)
-    ).limit(10).all()
+    ).limit(10)
     
     # Get top products by value
     top_products = Product.query.order_by(
-        desc(Product.quantity * Product.unit_price)
-    ).limit(5).all()
+        desc(Product.stock_value)
+    ).limit(5)
     
     return render_template('dashboard.html',
                          total_products=total_products,
@@ -49,3 +55,12 @@ def dashboard():
                          low_stock_products=low_stock_products,
                          recent_transactions=recent_transactions,
                          top_products=top_products)
+
+
+@bp.route('/dashboard/stream')
+@login_required
+def dashboard_stream():
+    """Server-sent events with dashboard changes as products and stock are committed"""
+    keepalive = current_app.config['DASHBOARD_STREAM_KEEPALIVE']
+    return Response(feed.stream(keepalive), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
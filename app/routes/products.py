@@ -1,8 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app import db
-from app.models import Product, Category, Supplier
-from app.forms import ProductForm
+from app.models import Product, Category, Supplier, BulkUpdate
+from app.forms import ProductForm, BulkDeleteForm, BulkUpdateForm
+from app import bulk
+from app.outbox import record_bulk_change
+from app.sku_index import sku_index
 
 bp = Blueprint('products', __name__, url_prefix='/products')
 
@@ -35,7 +38,8 @@ def index():
                          products=products,
                          categories=categories,
                          search=search,
-                         category_id=category_id)
+                         category_id=category_id,
+                         bulk_delete_form=BulkDeleteForm())
 
 
 @bp.route('/<int:id>')
@@ -60,8 +64,8 @@ def create():
             quantity=form.quantity.data,
             min_quantity=form.min_quantity.data,
             unit_price=form.unit_price.data,
-            category_id=form.category.data,
-            supplier_id=form.supplier.data
+            category_id=form.category.data or None,
+            supplier_id=form.supplier.data or None
         )
         db.session.add(product)
         db.session.commit()
@@ -86,8 +90,8 @@ def edit(id):
         product.quantity = form.quantity.data
         product.min_quantity = form.min_quantity.data
         product.unit_price = form.unit_price.data
-        product.category_id = form.category.data
-        product.supplier_id = form.supplier.data
+        product.category_id = form.category.data or None
+        product.supplier_id = form.supplier.data or None
         
         db.session.commit()
         
@@ -111,6 +115,68 @@ def delete(id):
     return redirect(url_for('products.index'))
 
 
+@bp.route('/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete():
+    """Delete the selected products in one statement"""
+    form = BulkDeleteForm()
+    if not form.validate_on_submit():
+        flash('The selection could not be submitted. Please try again.', 'danger')
+        return redirect(url_for('products.index'))
+    ids = form.ids.data
+    if not ids:
+        flash('No products selected.', 'warning')
+        return redirect(url_for('products.index'))
+    
+    # Their transactions are removed by ON DELETE CASCADE and recorded in
+    # the outbox along with the products
+    criteria = [Product.id.in_(ids)]
+    record_bulk_change(Product, criteria, 'delete')
+    deleted = Product.query.filter(*criteria).delete(synchronize_session=False)
+    db.session.commit()
+    
+    for product_id in ids:
+        sku_index.remove(product_id)
+    
+    flash(f'{deleted} products deleted successfully!', 'success')
+    return redirect(url_for('products.index'))
+
+
+@bp.route('/bulk-update', methods=['GET', 'POST'])
+@login_required
+def bulk_update():
+    """Preview and apply a price or threshold change to many products"""
+    form = BulkUpdateForm()
+    preview_count = None
+    sample = []
+    
+    if form.validate_on_submit():
+        skus = bulk.parse_skus(form.skus.data)
+        criteria = bulk.product_criteria(form.category.data, form.supplier.data, skus)
+        
+        if request.form.get('action') == 'apply':
+            audit = bulk.apply(criteria, form.field.data, form.mode.data, form.amount.data,
+                               user_id=current_user.id,
+                               description={'category_id': form.category.data or None,
+                                            'supplier_id': form.supplier.data or None,
+                                            'skus': skus})
+            flash(f'{audit.products_affected} products updated successfully!', 'success')
+            return redirect(url_for('products.bulk_update'))
+        
+        preview_count, sample = bulk.preview(criteria, form.field.data, form.mode.data,
+                                             form.amount.data)
+    
+    history = BulkUpdate.query.order_by(BulkUpdate.created_at.desc()).limit(10).all()
+    
+    return render_template('products/bulk_update.html',
+                         form=form,
+                         preview_count=preview_count,
+                         sample=sample,
+                         history=history,
+                         fields=bulk.FIELDS,
+                         modes=bulk.MODES)
+
+
 @bp.route('/low-stock')
 @login_required
 def low_stock():
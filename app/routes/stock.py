@@ -1,8 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from datetime import datetime
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError
 from app import db
 from app.models import Product, StockTransaction
 from app.forms import StockTransactionForm
+from app.outbox import record_bulk_change
+from app.sku_index import sku_index
 
 bp = Blueprint('stock', __name__, url_prefix='/stock')
 
@@ -99,3 +104,117 @@ def remove():
         return redirect(url_for('stock.index'))
     
     return render_template('stock/remove.html', form=form)
+
+
+@bp.route('/scan', methods=['POST'])
+@login_required
+def scan():
+    """Record a barcode scan as a stock movement (JSON API)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify(error='A JSON object is required'), 400
+    sku = data.get('sku')
+    transaction_type = data.get('type', 'IN')
+    quantity = data.get('quantity', 1)
+    unit_price = data.get('unit_price')
+    notes = data.get('notes')
+    
+    # bool is a subclass of int, so JSON true/false must be rejected explicitly
+    if (not isinstance(sku, str) or not sku.strip()
+            or not isinstance(transaction_type, str) or transaction_type.upper() not in ('IN', 'OUT')
+            or not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1):
+        return jsonify(error='A SKU, a type of IN or OUT and a positive quantity are required'), 400
+    if unit_price is not None and (not isinstance(unit_price, (int, float))
+                                   or isinstance(unit_price, bool) or unit_price < 0):
+        return jsonify(error='unit_price must be a non-negative number'), 400
+    if notes is not None and not isinstance(notes, str):
+        return jsonify(error='notes must be a string'), 400
+    sku = sku.strip()
+    transaction_type = transaction_type.upper()
+    
+    try:
+        # Resolve the SKU from the in-memory index; the UPDATE checks the SKU,
+        # so an entry made stale by another worker falls back to the database
+        product_id = sku_index.get(sku)
+        moved = product_id is not None and _move_stock(product_id, sku, transaction_type, quantity)
+        if not moved:
+            current = db.session.execute(
+                db.select(Product.id, Product.quantity).where(Product.sku == sku)
+            ).first()
+            if current is None:
+                sku_index.discard(sku)
+                return jsonify(error=f'Unknown SKU "{sku}"'), 404
+            if current.id != product_id:
+                sku_index.set(sku, current.id)
+                product_id = current.id
+                moved = _move_stock(product_id, sku, transaction_type, quantity)
+            if not moved:
+                db.session.rollback()
+                return jsonify(error=f'Insufficient stock! Available: {current.quantity}'), 409
+        
+        transaction = StockTransaction(
+            product_id=product_id,
+            user_id=current_user.id,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            unit_price=unit_price,
+            notes=notes
+        )
+        db.session.add(transaction)
+        db.session.flush()
+        
+        # Read inside the write transaction, so it includes this scan only
+        product = db.session.execute(
+            db.select(Product.name, Product.quantity).where(Product.id == product_id)
+        ).one()
+        result = {
+            'transaction_id': transaction.id,
+            'product_id': product_id,
+            'sku': sku,
+            'name': product.name,
+            'quantity': product.quantity
+        }
+        
+        db.session.commit()
+    except OperationalError as e:
+        db.session.rollback()
+        if not _is_lock_timeout(e):
+            raise
+        current_app.logger.warning('Scan of %s timed out waiting for a database lock', sku)
+        return jsonify(error='The database is busy, please scan again'), 503, {'Retry-After': '1'}
+    
+    return jsonify(result)
+
+
+def _move_stock(product_id, sku, transaction_type, quantity):
+    """Apply a scan to the product in one UPDATE; False if nothing matched.
+    
+    Concurrent scans of one SKU each add their own delta instead of
+    overwriting a quantity read earlier. OUT only matches while enough
+    stock is on hand.
+    """
+    delta = quantity if transaction_type == 'IN' else -quantity
+    new_quantity = func.coalesce(Product.quantity, 0) + delta
+    criteria = [Product.id == product_id, Product.sku == sku]
+    if transaction_type == 'OUT':
+        criteria.append(Product.quantity >= quantity)
+    
+    result = db.session.execute(
+        update(Product).where(*criteria).values(
+            quantity=new_quantity,
+            stock_value=new_quantity * func.coalesce(Product.unit_price, 0),
+            updated_at=datetime.utcnow()
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    if result.rowcount == 0:
+        return False
+    # Set-based writes bypass the flush that fills the outbox
+    record_bulk_change(Product, [Product.id == product_id], 'update')
+    return True
+
+
+def _is_lock_timeout(error):
+    # SQLite: "database is locked"; PostgreSQL and MySQL: lock (wait) timeouts
+    message = str(error.orig).lower()
+    return 'locked' in message or ('lock' in message and 'timeout' in message)
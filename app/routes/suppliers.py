@@ -1,7 +1,8 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required
+from sqlalchemy import func
 from app import db
-from app.models import Supplier
+from app.models import Supplier, Product
 from app.forms import SupplierForm
 
 bp = Blueprint('suppliers', __name__, url_prefix='/suppliers')
@@ -10,8 +11,14 @@ bp = Blueprint('suppliers', __name__, url_prefix='/suppliers')
 @bp.route('/')
 @login_required
 def index():
-    """List all suppliers"""
-    suppliers = Supplier.query.order_by(Supplier.name).all()
+    """List all suppliers with product count and stock value"""
+    suppliers = db.session.query(
+        Supplier,
+        func.count(Product.id).label('product_count'),
+        func.coalesce(func.sum(Product.quantity), 0).label('total_quantity'),
+        func.coalesce(func.sum(Product.stock_value), 0).label('total_value')
+    ).outerjoin(Product).group_by(Supplier.id).order_by(Supplier.name).all()
+    
     return render_template('suppliers/index.html', suppliers=suppliers)
 
 
@@ -20,7 +27,23 @@ def index():
 def view(id):
     """View supplier details"""
     supplier = Supplier.query.get_or_404(id)
-    return render_template('suppliers/view.html', supplier=supplier)
+    page = request.args.get('page', 1, type=int)
+    
+    products = Product.query.filter_by(supplier_id=supplier.id).order_by(Product.name).paginate(
+        page=page, per_page=current_app.config['ITEMS_PER_PAGE'], error_out=False
+    )
+    
+    # Aggregates over all of the supplier's products, not just this page
+    stats = db.session.query(
+        func.count(Product.id).label('product_count'),
+        func.coalesce(func.sum(Product.quantity), 0).label('total_quantity'),
+        func.coalesce(func.sum(Product.stock_value), 0).label('total_value')
+    ).filter(Product.supplier_id == supplier.id).one()
+    
+    return render_template('suppliers/view.html',
+                         supplier=supplier,
+                         products=products,
+                         stats=stats)
 
 
 @bp.route('/create', methods=['GET', 'POST'])
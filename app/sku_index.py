@@ -0,0 +1,93 @@
+"""In-process SKU index for barcode scanning"""
+import threading
+from sqlalchemy import event
+from app import db
+from app.models import Product
+
+
+class SkuIndex:
+    """Maps SKU to product id.
+    
+    Loaded at startup and kept current by product writes committed in this
+    process. Entries are hints: callers load the product by id and should
+    check its SKU, since other workers may have changed it.
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self._skus = {}
+        self._lock = threading.Lock()
+    
+    def load(self):
+        entries = dict(db.session.query(Product.sku, Product.id))
+        with self._lock:
+            self._entries = entries
+            self._skus = {product_id: sku for sku, product_id in entries.items()}
+    
+    def get(self, sku):
+        return self._entries.get(sku)
+    
+    def set(self, sku, product_id):
+        with self._lock:
+            # Drop the product's previous SKU if it was renamed
+            old_sku = self._skus.get(product_id)
+            if old_sku is not None and old_sku != sku:
+                self._entries.pop(old_sku, None)
+            self._entries[sku] = product_id
+            self._skus[product_id] = sku
+    
+    def discard(self, sku):
+        with self._lock:
+            product_id = self._entries.pop(sku, None)
+            if product_id is not None:
+                self._skus.pop(product_id, None)
+    
+    def remove(self, product_id):
+        with self._lock:
+            sku = self._skus.pop(product_id, None)
+            if sku is not None:
+                self._entries.pop(sku, None)
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+sku_index = SkuIndex()
+
+
+def _record_flush(session, flush_context):
+    changes = session.info.setdefault('sku_changes', [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Product):
+            # Values are captured now; they are expired after commit
+            changes.append((obj.id, obj.sku))
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            changes.append((obj.id, None))
+
+
+def _apply(session):
+    for product_id, sku in session.info.pop('sku_changes', ()):
+        if sku is None:
+            sku_index.remove(product_id)
+        else:
+            sku_index.set(sku, product_id)
+
+
+def _discard(session):
+    session.info.pop('sku_changes', None)
+
+
+def init_app(app):
+    """Load the index and keep it current on product writes"""
+    with app.app_context():
+        sku_index.load()
+    
+    listeners = [
+        ('after_flush', _record_flush),
+        ('after_commit', _apply),
+        ('after_rollback', _discard),
+    ]
+    for name, listener in listeners:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
@@ -64,8 +64,80 @@ document.addEventListener('DOMContentLoaded', function() {
             window.print();
         });
     });
+    
+    // Live dashboard updates
+    const dashboard = document.querySelector('[data-stream-url]');
+    if (dashboard && window.EventSource) {
+        const source = new EventSource(dashboard.dataset.streamUrl);
+        source.addEventListener('stock', function(e) {
+            applyStockChange(JSON.parse(e.data));
+        });
+    }
 });
 
+// Patch dashboard statistics and tables with a product or stock change event
+function applyStockChange(change) {
+    Object.keys(change.totals).forEach(function(name) {
+        const stat = document.querySelector('[data-stat="' + name + '"]');
+        if (stat) {
+            const value = change.totals[name];
+            stat.textContent = stat.dataset.format === 'currency' ? formatCurrency(value) : value;
+        }
+    });
+    
+    // Latest 10 transactions, newest first
+    const transactions = document.getElementById('recent-transactions');
+    if (transactions) {
+        transactions.replaceChildren.apply(transactions, change.transactions.map(function(t) {
+            const row = buildRow([t.product, '', t.quantity, t.date]);
+            row.cells[1].appendChild(buildBadge(t.type === 'IN' ? 'bg-success' : 'bg-danger', t.type));
+            return row;
+        }));
+        toggleEmptyState(transactions);
+    }
+    
+    // Up to 10 low stock products, lowest quantity first
+    const lowStock = document.getElementById('low-stock-products');
+    if (lowStock) {
+        lowStock.replaceChildren.apply(lowStock, change.low_stock.map(function(p) {
+            const row = buildRow([p.name, p.sku, '', p.min_quantity]);
+            row.dataset.productId = p.id;
+            row.cells[2].appendChild(buildBadge('bg-danger', p.quantity));
+            return row;
+        }));
+        toggleEmptyState(lowStock);
+    }
+}
+
+// Build a badge holding text
+function buildBadge(color, text) {
+    const badge = document.createElement('span');
+    badge.className = 'badge ' + color;
+    badge.textContent = text;
+    return badge;
+}
+
+// Build a table row with one text cell per value
+function buildRow(values) {
+    const row = document.createElement('tr');
+    values.forEach(function(value) {
+        const cell = document.createElement('td');
+        cell.textContent = value;
+        row.appendChild(cell);
+    });
+    return row;
+}
+
+// Show a dashboard table when it has rows, its empty message otherwise
+function toggleEmptyState(tbody) {
+    const wrapper = tbody.closest('.table-responsive');
+    const empty = wrapper.nextElementSibling;
+    wrapper.classList.toggle('d-none', tbody.rows.length === 0);
+    if (empty) {
+        empty.classList.toggle('d-none', tbody.rows.length > 0);
+    }
+}
+
 // Helper function to format currency
 function formatCurrency(amount) {
     return new Intl.NumberFormat('en-US', {
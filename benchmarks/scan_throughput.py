@@ -0,0 +1,106 @@
+"""Barcode scan throughput for one worker, optionally with concurrent docks.
+
+Seeds a throwaway SQLite database, then posts scans to /stock/scan through
+the Flask test client for a fixed time and reports scans per second:
+
+    python benchmarks/scan_throughput.py --products 1000 --seconds 10
+
+With --threads several docks scan at once (--hot sends every scan to one
+SKU). Afterwards each product's quantity is checked against the scans that
+succeeded, so lost updates fail the run:
+
+    python benchmarks/scan_throughput.py --threads 8 --hot --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=1, help='Concurrent scanning clients.')
+    parser.add_argument('--hot', action='store_true', help='Send every scan to the same SKU.')
+    args = parser.parse_args()
+    
+    # The database URL is read when config is imported
+    workdir = tempfile.mkdtemp(prefix='scan-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['JINJA_BYTECODE_CACHE_DIR'] = os.path.join(workdir, 'jinja')
+    
+    from app import create_app, db
+    from app.models import User, Product, StockTransaction
+    
+    app = create_app('production')
+    with app.app_context():
+        db.session.add_all([
+            Product(name=f'Product {i}', sku=f'BENCH-{i:06d}', quantity=1000000,
+                    min_quantity=10, unit_price=1.0)
+            for i in range(args.products)
+        ])
+        db.session.commit()
+        admin_id = User.query.filter_by(username='admin').first().id
+    
+    skus = [f'BENCH-{i:06d}' for i in range(args.products)]
+    if args.hot:
+        skus = skus[:1]
+    latencies = []
+    statuses = Counter()
+    deltas = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+    
+    def dock():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(admin_id)
+            session['_fresh'] = True
+        while time.perf_counter() < deadline:
+            sku = random.choice(skus)
+            transaction_type = random.choice(('IN', 'OUT'))
+            started = time.perf_counter()
+            response = client.post('/stock/scan', json={'sku': sku, 'type': transaction_type})
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+                    deltas[sku] += 1 if transaction_type == 'IN' else -1
+    
+    docks = [threading.Thread(target=dock) for _ in range(args.threads)]
+    wall_started = time.perf_counter()
+    for thread in docks:
+        thread.start()
+    for thread in docks:
+        thread.join()
+    wall = time.perf_counter() - wall_started
+    
+    latencies.sort()
+    print(f'{len(latencies)} scans in {wall:.2f}s with {args.threads} thread(s): '
+          f'{len(latencies) / wall:.0f} scans/s per worker')
+    print(f'p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, '
+          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms')
+    print('responses: ' + ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items())))
+    
+    # Every successful scan must be reflected in the quantity and the ledger
+    with app.app_context():
+        lost = 0
+        for sku, delta in deltas.items():
+            quantity = db.session.query(Product.quantity).filter_by(sku=sku).scalar()
+            lost += abs(quantity - (1000000 + delta))
+        recorded = StockTransaction.query.count()
+    print(f'{recorded} ledger rows, {lost} units lost')
+    if lost or recorded != len(latencies) or any(status >= 500 and status != 503 for status in statuses):
+        sys.exit('Scans were lost or failed')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,16 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'inventory.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Read replica (optional). Read-only blueprints and views marked with
+    # @replica_read query it; writes always go to the primary.
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_BLUEPRINTS = ('reports',)
+    # Seconds a client keeps reading from the primary after writing
+    REPLICA_MAX_LAG = int(os.environ.get('REPLICA_MAX_LAG') or 5)
+    # Copy the primary over a local SQLite replica at startup (testing only)
+    REPLICA_COPY_PRIMARY = False
     WTF_CSRF_ENABLED = True
     
     # Pagination
@@ -18,6 +28,41 @@ class Config:
     
     # Low stock threshold
     LOW_STOCK_THRESHOLD = 10
+    
+    # Seconds between keepalive comments on the dashboard event stream
+    DASHBOARD_STREAM_KEEPALIVE = 15
+    # Seconds to gather commits into one dashboard update
+    DASHBOARD_PUBLISH_INTERVAL = 0.5
+    
+    # Change feed (outbox) for downstream sync
+    CHANGE_FEED_PAGE_SIZE = 1000
+    CHANGE_FEED_SETTLE_SECONDS = 2
+    CHANGE_FEED_RETENTION_DAYS = 30
+    
+    # Per-request profiling: every request when enabled, otherwise admin
+    # requests sending "X-Profile: 1"
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    PROFILING_HEADER = 'X-Profile'
+    PROFILING_DIR = os.environ.get('PROFILING_DIR') or os.path.join(basedir, 'profiles')
+    PROFILING_TOP_SITES = 15
+    # Deep enough to reach application code from inside SQLAlchemy and Jinja
+    PROFILING_TRACEBACK_DEPTH = 30
+    # Traced memory is polled this often; a snapshot is taken each time it
+    # grows this many bytes past the last one
+    PROFILING_MEMORY_INTERVAL = 0.01
+    PROFILING_SNAPSHOT_STEP = 256 * 1024
+    # Newest reports kept in PROFILING_DIR; older ones are deleted
+    PROFILING_MAX_REPORTS = int(os.environ.get('PROFILING_MAX_REPORTS') or 500)
+    # Sampling CPU profile alongside the memory profile
+    PROFILING_CPU = os.environ.get('PROFILING_CPU', '').lower() in ('1', 'true', 'yes')
+    PROFILING_CPU_INTERVAL = 0.005
+    
+    # Template fragment cache ({% cache %} blocks), per worker process
+    FRAGMENT_CACHE_SIZE = 128
+    FRAGMENT_CACHE_TTL = 60
+    # Compiled template cache shared by workers (None to disable)
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR') or \
+        os.path.join(basedir, '.jinja_cache')
 
 
 class DevelopmentConfig(Config):
@@ -30,8 +75,21 @@ class ProductionConfig(Config):
     DEBUG = False
 
 
+class TestingConfig(Config):
+    """Testing configuration with a local SQLite primary and replica"""
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'test.db')
+    SQLALCHEMY_BINDS = {'replica': 'sqlite:///' + os.path.join(basedir, 'test-replica.db')}
+    REPLICA_MAX_LAG = 0
+    REPLICA_COPY_PRIMARY = True
+    FRAGMENT_CACHE_TTL = 0
+    JINJA_BYTECODE_CACHE_DIR = None
+
+
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,40 @@
+"""add bulk updates
+
+Revision ID: 1a6f93d2b8e5
+Revises: f4b0c6e81a39
+Create Date: 2026-10-19 20:12:03.650418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a6f93d2b8e5'
+down_revision = 'f4b0c6e81a39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already creates the table on a fresh database
+    if 'bulk_updates' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('bulk_updates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('field', sa.String(length=20), nullable=False),
+    sa.Column('mode', sa.String(length=10), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('criteria', sa.Text(), nullable=True),
+    sa.Column('products_affected', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_bulk_updates_created_at', 'bulk_updates', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bulk_updates_created_at', table_name='bulk_updates')
+    op.drop_table('bulk_updates')
@@ -0,0 +1,36 @@
+"""add foreign key indexes
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-19 09:12:44.103216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables are created by db.create_all() on startup, which also creates
+    # these indexes on a fresh database, hence if_not_exists.
+    op.create_index('ix_products_category_id_name', 'products',
+                    ['category_id', 'name'], unique=False, if_not_exists=True)
+    op.create_index('ix_products_supplier_id_name', 'products',
+                    ['supplier_id', 'name'], unique=False, if_not_exists=True)
+    op.create_index('ix_stock_transactions_product_id_transaction_date', 'stock_transactions',
+                    ['product_id', 'transaction_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_stock_transactions_user_id', 'stock_transactions',
+                    ['user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_stock_transactions_user_id', table_name='stock_transactions')
+    op.drop_index('ix_stock_transactions_product_id_transaction_date', table_name='stock_transactions')
+    op.drop_index('ix_products_supplier_id_name', table_name='products')
+    op.drop_index('ix_products_category_id_name', table_name='products')
@@ -0,0 +1,28 @@
+"""add reconciliation unresolved
+
+Revision ID: 5d2e8a71c4f0
+Revises: 1a6f93d2b8e5
+Create Date: 2026-10-20 10:14:37.508231
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8a71c4f0'
+down_revision = '1a6f93d2b8e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already adds the column on a fresh database
+    columns = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('reconciliation_runs')]
+    if 'unresolved' not in columns:
+        op.add_column('reconciliation_runs', sa.Column('unresolved', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reconciliation_runs') as batch_op:
+        batch_op.drop_column('unresolved')
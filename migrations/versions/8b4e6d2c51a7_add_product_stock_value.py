@@ -0,0 +1,35 @@
+"""add product stock value
+
+Revision ID: 8b4e6d2c51a7
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-19 11:40:27.518349
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d2c51a7'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already adds the column on a fresh database
+    columns = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('products')]
+    if 'stock_value' not in columns:
+        op.add_column('products', sa.Column('stock_value', sa.Float(), nullable=True))
+    
+    # Back-fill existing rows
+    op.execute('UPDATE products SET stock_value = COALESCE(quantity, 0) * unit_price')
+    
+    op.create_index('ix_products_stock_value', 'products', ['stock_value'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_products_stock_value', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('stock_value')
@@ -0,0 +1,40 @@
+"""change events autoincrement
+
+Revision ID: 9c3f7e1b2a64
+Revises: 5d2e8a71c4f0
+Create Date: 2026-10-21 09:32:18.640917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f7e1b2a64'
+down_revision = '5d2e8a71c4f0'
+branch_labels = None
+depends_on = None
+
+
+def table_sql():
+    return op.get_bind().execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'change_events'")
+    ).scalar()
+
+
+def upgrade():
+    # Other databases never reuse ids; SQLite does once the table is empty.
+    # db.create_all() already adds AUTOINCREMENT on a fresh database.
+    if op.get_bind().dialect.name != 'sqlite' or 'AUTOINCREMENT' in table_sql().upper():
+        return
+    # Copying the rows sets the sequence to the highest id kept
+    with op.batch_alter_table('change_events', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('change_events', recreate='always') as batch_op:
+        pass
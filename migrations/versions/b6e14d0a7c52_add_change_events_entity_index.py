@@ -0,0 +1,26 @@
+"""add change events entity index
+
+Revision ID: b6e14d0a7c52
+Revises: 9c3f7e1b2a64
+Create Date: 2026-10-21 14:05:51.372094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e14d0a7c52'
+down_revision = '9c3f7e1b2a64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already creates the index on a fresh database
+    op.create_index('ix_change_events_entity_id', 'change_events',
+                    ['entity', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_change_events_entity_id', table_name='change_events')
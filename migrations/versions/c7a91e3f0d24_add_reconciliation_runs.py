@@ -0,0 +1,39 @@
+"""add reconciliation runs
+
+Revision ID: c7a91e3f0d24
+Revises: 8b4e6d2c51a7
+Create Date: 2026-10-19 14:05:51.862093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a91e3f0d24'
+down_revision = '8b4e6d2c51a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already creates the table on a fresh database
+    if 'reconciliation_runs' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('reconciliation_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('incremental', sa.Boolean(), nullable=True),
+    sa.Column('products_checked', sa.Integer(), nullable=True),
+    sa.Column('discrepancies', sa.Integer(), nullable=True),
+    sa.Column('corrected', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reconciliation_runs_started_at', 'reconciliation_runs',
+                    ['started_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reconciliation_runs_started_at', table_name='reconciliation_runs')
+    op.drop_table('reconciliation_runs')
@@ -0,0 +1,37 @@
+"""add change events
+
+Revision ID: e25d8f4a93c6
+Revises: c7a91e3f0d24
+Create Date: 2026-10-19 16:21:09.334870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e25d8f4a93c6'
+down_revision = 'c7a91e3f0d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() already creates the table on a fresh database
+    if 'change_events' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('change_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_events_created_at', 'change_events', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_events_created_at', table_name='change_events')
+    op.drop_table('change_events')
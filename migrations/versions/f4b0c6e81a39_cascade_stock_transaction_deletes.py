@@ -0,0 +1,50 @@
+"""cascade stock transaction deletes
+
+Revision ID: f4b0c6e81a39
+Revises: e25d8f4a93c6
+Create Date: 2026-10-19 18:47:30.215664
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b0c6e81a39'
+down_revision = 'e25d8f4a93c6'
+branch_labels = None
+depends_on = None
+
+# Names the unnamed SQLite constraint so batch mode can replace it
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+DEFAULT_NAME = 'fk_stock_transactions_product_id_products'
+
+
+def product_foreign_key():
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys('stock_transactions'):
+        if fk['constrained_columns'] == ['product_id']:
+            return fk
+
+
+def replace_product_foreign_key(ondelete):
+    fk = product_foreign_key()
+    name = fk['name'] or DEFAULT_NAME
+    with op.batch_alter_table('stock_transactions', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'products', ['product_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    # Foreign keys are enforced on SQLite from now on, so clear the 0 ids
+    # stored when no category or supplier was selected
+    op.execute('UPDATE products SET category_id = NULL WHERE category_id = 0')
+    op.execute('UPDATE products SET supplier_id = NULL WHERE supplier_id = 0')
+    
+    # db.create_all() already creates the cascading key on a fresh database
+    fk = product_foreign_key()
+    if (fk['options'].get('ondelete') or '').upper() != 'CASCADE':
+        replace_product_foreign_key('CASCADE')
+
+
+def downgrade():
+    replace_product_foreign_key(None)
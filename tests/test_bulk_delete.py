@@ -0,0 +1,62 @@
+"""Deleting the products selected on the product list"""
+import re
+import unittest
+from app import create_app, db
+from app.cli import remove_sqlite_files
+from app.models import Product, User
+from config import TestingConfig
+
+
+class BulkDeleteTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        self.app.config['WTF_CSRF_ENABLED'] = True
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='admin').first().id
+            products = [Product(name=f'Widget {i}', sku=f'W-{i}', quantity=1, unit_price=1.0) for i in range(3)]
+            db.session.add_all(products)
+            db.session.commit()
+            self.ids = [product.id for product in products]
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _csrf_token(self):
+        page = self.client.get('/products/').get_data(as_text=True)
+        form = page[page.index('id="bulk-delete-form"'):]
+        return re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', form).group(1)
+    
+    def _remaining(self):
+        with self.app.app_context():
+            return Product.query.count()
+    
+    def test_rejects_missing_csrf_token(self):
+        response = self.client.post('/products/bulk-delete', data={'ids': self.ids[:2]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._remaining(), 3)
+    
+    def test_rejects_invalid_ids(self):
+        response = self.client.post('/products/bulk-delete',
+                                    data={'ids': ['x'], 'csrf_token': self._csrf_token()})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._remaining(), 3)
+    
+    def test_deletes_selected_products(self):
+        response = self.client.post('/products/bulk-delete',
+                                    data={'ids': self.ids[:2], 'csrf_token': self._csrf_token()},
+                                    follow_redirects=True)
+        self.assertIn(b'2 products deleted successfully!', response.data)
+        self.assertEqual(self._remaining(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Bulk price and threshold updates"""
+import unittest
+from app import create_app, db
+from app.cli import remove_sqlite_files
+from app.models import BulkUpdate, Category, Product, User
+from config import TestingConfig
+
+
+class BulkUpdateTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.user_id = User.query.filter_by(username='admin').first().id
+            tools, toys = Category(name='Tools'), Category(name='Toys')
+            db.session.add_all([tools, toys])
+            db.session.flush()
+            self.tools_id = tools.id
+            db.session.add_all([
+                Product(name='Hammer', sku='T-1', quantity=4, min_quantity=2, unit_price=10.0, category_id=tools.id),
+                Product(name='Saw', sku='T-2', quantity=3, min_quantity=1, unit_price=20.0, category_id=tools.id),
+                Product(name='Ball', sku='Y-1', quantity=5, min_quantity=1, unit_price=3.0, category_id=toys.id),
+            ])
+            db.session.commit()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user_id)
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _post(self, action, **fields):
+        data = {'category': 0, 'supplier': 0, 'skus': '', 'field': 'unit_price',
+                'mode': 'percent', 'amount': 10, 'action': action}
+        data.update(fields)
+        return self.client.post('/products/bulk-update', data=data)
+    
+    def _products(self):
+        with self.app.app_context():
+            return {p.sku: (p.unit_price, p.min_quantity, p.stock_value) for p in Product.query.all()}
+    
+    def test_missing_selection_is_a_form_error(self):
+        response = self.client.post('/products/bulk-update', data={
+            'category': 0, 'supplier': 0, 'field': 'unit_price', 'mode': 'percent', 'amount': 10
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Select a category, a supplier or enter SKUs.', response.data)
+    
+    def test_preview_counts_matches_without_changing_them(self):
+        before = self._products()
+        response = self._post('preview', category=self.tools_id)
+        self.assertIn(b'Preview: 2 products match', response.data)
+        response = self._post('preview', category=self.tools_id, skus='T-2, Y-1')
+        self.assertIn(b'Preview: 1 products match', response.data)
+        self.assertEqual(self._products(), before)
+        with self.app.app_context():
+            self.assertEqual(BulkUpdate.query.count(), 0)
+    
+    def test_apply_updates_prices_and_stock_value(self):
+        response = self._post('apply', category=self.tools_id)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._products(), {
+            'T-1': (11.0, 2, 44.0),
+            'T-2': (22.0, 1, 66.0),
+            'Y-1': (3.0, 1, 15.0),
+        })
+    
+    def test_apply_thresholds_never_go_below_zero(self):
+        self._post('apply', skus='T-1\nY-1', field='min_quantity', mode='absolute', amount=-3)
+        products = self._products()
+        self.assertEqual((products['T-1'][1], products['T-2'][1], products['Y-1'][1]), (0, 1, 0))
+        # Stock value only depends on the price
+        self.assertEqual(products['T-1'][2], 40.0)
+    
+    def test_apply_records_audit_entry(self):
+        self._post('apply', category=self.tools_id, skus='T-1 T-2', mode='absolute', amount=-2.5)
+        with self.app.app_context():
+            audit = BulkUpdate.query.one()
+            self.assertEqual((audit.user_id, audit.field, audit.mode, audit.amount, audit.products_affected),
+                             (self.user_id, 'unit_price', 'absolute', -2.5, 2))
+            self.assertEqual(audit.criteria_dict,
+                             {'category_id': self.tools_id, 'supplier_id': None, 'skus': ['T-1', 'T-2']})
+
+
+if __name__ == '__main__':
+    unittest.main()
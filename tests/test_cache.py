@@ -0,0 +1,85 @@
+"""Template fragments invalidated through the change feed"""
+import sqlite3
+import unittest
+from app import create_app, db, replica
+from app.cache import fragment_cache
+from app.cli import remove_sqlite_files
+from app.models import Category, Product, User
+from config import TestingConfig
+
+
+class FragmentCacheTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        fragment_cache.ttl = 60
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='admin').first().id
+            category = Category(name='Tools')
+            db.session.add(category)
+            db.session.flush()
+            self.category_id = category.id
+            db.session.add(Product(name='Hammer', sku='T-1', quantity=4, unit_price=10.0,
+                                   category_id=category.id))
+            db.session.commit()
+            replica.copy_primary(db)
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+    
+    def tearDown(self):
+        fragment_cache.ttl = TestingConfig.FRAGMENT_CACHE_TTL
+        fragment_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _rename_elsewhere(self, name, record_change=True):
+        # Another worker's write: straight to the database, bypassing this
+        # process's session
+        path = TestingConfig.SQLALCHEMY_DATABASE_URI[len('sqlite:///'):]
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute('UPDATE categories SET name = ? WHERE id = ?', (name, self.category_id))
+            if record_change:
+                conn.execute("INSERT INTO change_events (entity, entity_id, operation, created_at) "
+                             "VALUES ('categories', ?, 'update', datetime('now'))", (self.category_id,))
+        conn.close()
+    
+    def _category_stats(self):
+        response = self.client.get('/reports/')
+        self.assertEqual(response.status_code, 200)
+        return response.get_data(as_text=True)
+    
+    def test_fragment_is_cached(self):
+        self.assertIn('Tools', self._category_stats())
+        # Unrecorded writes are not seen until the entry expires
+        self._rename_elsewhere('Hardware', record_change=False)
+        with self.app.app_context():
+            replica.copy_primary(db)
+        self.assertIn('Tools', self._category_stats())
+    
+    def test_write_from_another_worker_invalidates(self):
+        self.assertIn('Tools', self._category_stats())
+        self._rename_elsewhere('Hardware')
+        with self.app.app_context():
+            replica.copy_primary(db)
+        page = self._category_stats()
+        self.assertIn('Hardware', page)
+        self.assertNotIn('Tools', page)
+    
+    def test_lagging_replica_is_not_cached_as_current(self):
+        self.assertIn('Tools', self._category_stats())
+        self._rename_elsewhere('Hardware')
+        # The replica has neither the rename nor its change yet
+        self.assertIn('Tools', self._category_stats())
+        with self.app.app_context():
+            replica.copy_primary(db)
+        self.assertIn('Hardware', self._category_stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
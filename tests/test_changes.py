@@ -0,0 +1,107 @@
+"""Change outbox and the /changes/ feed"""
+import unittest
+from app import create_app, db
+from app.cli import remove_sqlite_files
+from app.models import ChangeEvent, Product, StockTransaction, User
+from config import TestingConfig
+
+
+class ChangeFeedTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        self.app.config['CHANGE_FEED_SETTLE_SECONDS'] = 0
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.user_id = User.query.filter_by(username='admin').first().id
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user_id)
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _add_product(self, sku, transactions=0):
+        with self.app.app_context():
+            product = Product(name=f'Widget {sku}', sku=sku, quantity=transactions, unit_price=2.0)
+            db.session.add(product)
+            db.session.flush()
+            for _ in range(transactions):
+                db.session.add(StockTransaction(product_id=product.id, user_id=self.user_id,
+                                                transaction_type='IN', quantity=1))
+            db.session.commit()
+            return product.id
+    
+    def _changes(self, **args):
+        response = self.client.get('/changes/', query_string=args)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+    
+    def test_session_and_set_based_writes_are_recorded(self):
+        product_id = self._add_product('W-1')
+        response = self.client.post(f'/products/{product_id}/edit', data={
+            'name': 'Renamed', 'sku': 'W-1', 'quantity': 3, 'min_quantity': 5,
+            'unit_price': 2.0, 'category': 0, 'supplier': 0
+        })
+        self.assertEqual(response.status_code, 302)
+        self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'IN', 'quantity': 4})
+        
+        changes = [(c['entity'], c['operation'], c['data']) for c in self._changes()['changes']]
+        self.assertEqual([(entity, operation) for entity, operation, _ in changes], [
+            ('products', 'insert'), ('products', 'update'), ('products', 'update'), ('stock_transactions', 'insert')
+        ])
+        self.assertEqual(changes[1][2]['name'], 'Renamed')
+        # The scan's UPDATE is recorded with the row as written
+        self.assertEqual(changes[2][2]['quantity'], 7)
+        self.assertEqual(changes[2][2]['stock_value'], 14.0)
+    
+    def test_paging_follows_the_cursor(self):
+        for i in range(5):
+            self._add_product(f'W-{i}')
+        seen = []
+        cursor = 0
+        while True:
+            page = self._changes(after=cursor, limit=2)
+            seen.extend(change['id'] for change in page['changes'])
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(set(seen)))
+        self.assertEqual(self._changes(after=cursor), {'changes': [], 'next_cursor': cursor, 'has_more': False})
+        self.assertEqual(len(self._changes(limit=0)['changes']), 1)
+    
+    def test_deletes_record_cascaded_transactions(self):
+        first = self._add_product('W-1', transactions=2)
+        second = self._add_product('W-2', transactions=1)
+        third = self._add_product('W-3', transactions=1)
+        cursor = self._changes()['next_cursor']
+        
+        self.client.post(f'/products/{first}/delete')
+        self.client.post('/products/bulk-delete', data={'ids': [second, third]})
+        
+        deleted = [(c['entity'], c['operation']) for c in self._changes(after=cursor)['changes']]
+        self.assertEqual(sorted(deleted), sorted([('products', 'delete')] * 3 + [('stock_transactions', 'delete')] * 4))
+        with self.app.app_context():
+            self.assertEqual(StockTransaction.query.count(), 0)
+    
+    def test_ids_are_not_reused_after_prune(self):
+        self._add_product('W-1')
+        self._add_product('W-2')
+        last_id = self._changes()['next_cursor']
+        
+        result = self.app.test_cli_runner().invoke(args=['changes', 'prune', '--days', '0'])
+        self.assertIn('Deleted 2 changes', result.output)
+        
+        self._add_product('W-3')
+        changes = self._changes(after=last_id)['changes']
+        self.assertEqual(len(changes), 1)
+        self.assertGreater(changes[0]['id'], last_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
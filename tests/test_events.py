@@ -0,0 +1,66 @@
+"""Live dashboard updates published after product and stock commits"""
+import json
+import queue
+import unittest
+from unittest import mock
+from app import create_app, db, events
+from app.cli import remove_sqlite_files
+from app.models import Product, User
+from config import TestingConfig
+
+
+class DashboardEventsTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        self.app.config['DASHBOARD_PUBLISH_INTERVAL'] = 0.2
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='admin').first().id
+            db.session.add(Product(name='Widget', sku='W-1', quantity=5, min_quantity=1, unit_price=2.0))
+            db.session.commit()
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        self.subscriber = events.feed.subscribe()
+    
+    def tearDown(self):
+        events.feed.unsubscribe(self.subscriber)
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _next_event(self):
+        message = self.subscriber.get(timeout=5)
+        return json.loads(message.split('data: ', 1)[1])
+    
+    def test_burst_of_writes_publishes_one_snapshot(self):
+        for _ in range(3):
+            response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'IN'})
+            self.assertEqual(response.status_code, 200)
+        change = self._next_event()
+        self.assertEqual(change['totals']['total_value'], 16.0)
+        self.assertEqual(len(change['transactions']), 3)
+        with self.assertRaises(queue.Empty):
+            self.subscriber.get(timeout=0.5)
+    
+    def test_failed_snapshot_does_not_fail_the_write(self):
+        with mock.patch.object(events, 'dashboard_snapshot', side_effect=RuntimeError('boom')):
+            response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'IN'})
+            self.assertEqual(response.status_code, 200)
+            with self.assertRaises(queue.Empty):
+                self.subscriber.get(timeout=0.5)
+        # The publisher keeps running after an error
+        self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'IN'})
+        self.assertEqual(self._next_event()['totals']['total_value'], 14.0)
+    
+    def test_failed_notify_does_not_fail_the_write(self):
+        with mock.patch.object(events.publisher, 'notify', side_effect=RuntimeError('boom')):
+            response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'IN'})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
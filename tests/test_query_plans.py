@@ -0,0 +1,43 @@
+"""Query plans of the SQL every route issues"""
+import unittest
+from app import create_app, db, query_plans
+from app.cli import remove_sqlite_files
+from config import TestingConfig
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def test_routes_do_not_scan_full_tables(self):
+        findings, unreached, _ = query_plans.check(self.app)
+        self.assertEqual(unreached, [])
+        failed = [(f.endpoint, ' '.join(f.statement.split()), f.plan) for f in findings if f.failed]
+        self.assertEqual(failed, [])
+        self.assertTrue(findings)
+        # Each required index must be used by some request
+        for _, _, index in query_plans.REQUIRED_INDEXES:
+            self.assertTrue(any(index in step for f in findings for step in f.plan), index)
+    
+    def test_filtered_routes_fail_without_their_index(self):
+        with self.app.app_context():
+            db.session.execute(db.text('DROP INDEX ix_products_category_id_name'))
+            db.session.execute(db.text('DROP INDEX ix_stock_transactions_product_id_transaction_date'))
+            db.session.commit()
+        findings, _, _ = query_plans.check(self.app)
+        failed = {f.endpoint for f in findings if f.failed}
+        self.assertIn('products.index', failed)
+        self.assertIn('stock.index', failed)
+
+
+if __name__ == '__main__':
+    unittest.main()
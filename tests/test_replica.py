@@ -0,0 +1,108 @@
+"""Read/write splitting between the primary and the replica bind"""
+import unittest
+from sqlalchemy import event
+from app import create_app, db, replica
+from app.cli import remove_sqlite_files
+from app.models import Product, User
+from config import TestingConfig
+
+
+class ReplicaRoutingTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            user_id = User.query.filter_by(username='admin').first().id
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+        
+        # Statements seen by each engine
+        self.statements = {None: [], replica.REPLICA: []}
+        with self.app.app_context():
+            for key, statements in self.statements.items():
+                event.listen(db.engines[key], 'before_cursor_execute', self._recorder(statements))
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _recorder(self, statements):
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        return record
+    
+    def _reset(self):
+        for statements in self.statements.values():
+            statements.clear()
+    
+    def test_replica_has_schema_and_data(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/reports/')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_replica_routed_get_reads_replica(self):
+        self._reset()
+        self.assertEqual(self.client.get('/reports/').status_code, 200)
+        self.assertTrue(self.statements[replica.REPLICA])
+        self.assertEqual(self.statements[None], [])
+    
+    def test_other_get_reads_primary(self):
+        self._reset()
+        self.assertEqual(self.client.get('/products/').status_code, 200)
+        self.assertTrue(self.statements[None])
+        self.assertEqual(self.statements[replica.REPLICA], [])
+    
+    def test_write_goes_to_primary(self):
+        self._reset()
+        response = self.client.post('/products/create', data={
+            'name': 'Widget', 'sku': 'W-1', 'quantity': 5, 'min_quantity': 1,
+            'unit_price': 2.5, 'category': 0, 'supplier': 0
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([s for s in self.statements[replica.REPLICA] if s.startswith('INSERT')], [])
+        with self.app.app_context():
+            primary = db.session.execute(
+                Product.__table__.select().where(Product.sku == 'W-1'),
+                bind_arguments={'bind': db.engines[None]}
+            ).all()
+            copy = db.session.execute(
+                Product.__table__.select().where(Product.sku == 'W-1'),
+                bind_arguments={'bind': db.engines[replica.REPLICA]}
+            ).all()
+        self.assertEqual(len(primary), 1)
+        self.assertEqual(copy, [])
+    
+    def test_reads_primary_after_write(self):
+        self.app.config['REPLICA_MAX_LAG'] = 60
+        self.client.post('/products/create', data={
+            'name': 'Widget', 'sku': 'W-1', 'quantity': 5, 'min_quantity': 1,
+            'unit_price': 2.5, 'category': 0, 'supplier': 0
+        })
+        self._reset()
+        self.assertEqual(self.client.get('/reports/').status_code, 200)
+        self.assertTrue(self.statements[None])
+        self.assertEqual(self.statements[replica.REPLICA], [])
+
+    
+    def test_reads_primary_after_bulk_delete(self):
+        self.app.config['REPLICA_MAX_LAG'] = 60
+        with self.app.app_context():
+            product = Product(name='Widget', sku='W-1', quantity=5, unit_price=2.5)
+            db.session.add(product)
+            db.session.commit()
+            product_id = product.id
+        self.client.post('/products/bulk-delete', data={'ids': [product_id]})
+        self._reset()
+        self.assertEqual(self.client.get('/reports/').status_code, 200)
+        self.assertTrue(self.statements[None])
+        self.assertEqual(self.statements[replica.REPLICA], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
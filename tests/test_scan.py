@@ -0,0 +1,98 @@
+"""Barcode scans posted to /stock/scan"""
+import threading
+import unittest
+from app import create_app, db
+from app.cli import remove_sqlite_files
+from app.models import Product, StockTransaction, User
+from config import TestingConfig
+
+
+class ScanTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        remove_sqlite_files(TestingConfig)
+        self.app = create_app('testing')
+        with self.app.app_context():
+            self.user_id = User.query.filter_by(username='admin').first().id
+            db.session.add(Product(name='Widget', sku='W-1', quantity=5, min_quantity=1, unit_price=2.0))
+            db.session.commit()
+        self.client = self._client()
+    
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        remove_sqlite_files(TestingConfig)
+    
+    def _client(self):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(self.user_id)
+        return client
+    
+    def _product(self):
+        with self.app.app_context():
+            product = Product.query.filter_by(sku='W-1').one()
+            return product.quantity, product.stock_value, StockTransaction.query.count()
+    
+    def test_rejects_non_object_body(self):
+        for body in ([1, 2], 'W-1', 5, None):
+            response = self.client.post('/stock/scan', json=body)
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(self._product(), (5, 10.0, 0))
+    
+    def test_rejects_invalid_fields(self):
+        for body in ({'sku': 'W-1', 'type': 0}, {'sku': 'W-1', 'type': False}, {'sku': 'W-1', 'type': ''},
+                     {'sku': 'W-1', 'type': 'MOVE'}, {'sku': 5}, {'sku': ' '},
+                     {'sku': 'W-1', 'quantity': True}, {'sku': 'W-1', 'quantity': 0},
+                     {'sku': 'W-1', 'unit_price': False}, {'sku': 'W-1', 'notes': ['x']}):
+            response = self.client.post('/stock/scan', json=body)
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(self._product(), (5, 10.0, 0))
+    
+    def test_unknown_sku(self):
+        response = self.client.post('/stock/scan', json={'sku': 'NOPE'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_scan_in_and_out(self):
+        response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'in', 'quantity': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['quantity'], 8)
+        response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'OUT', 'quantity': 6})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['quantity'], 2)
+        self.assertEqual(self._product(), (2, 4.0, 2))
+    
+    def test_insufficient_stock(self):
+        response = self.client.post('/stock/scan', json={'sku': 'W-1', 'type': 'OUT', 'quantity': 6})
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('Available: 5', response.get_json()['error'])
+        self.assertEqual(self._product(), (5, 10.0, 0))
+    
+    def test_concurrent_scans_do_not_lose_updates(self):
+        results = []
+        
+        def dock(transaction_type):
+            client = self._client()
+            for _ in range(10):
+                response = client.post('/stock/scan', json={'sku': 'W-1', 'type': transaction_type})
+                results.append((transaction_type, response.status_code))
+        
+        docks = [threading.Thread(target=dock, args=(t,)) for t in ('IN', 'OUT', 'IN', 'OUT')]
+        for thread in docks:
+            thread.start()
+        for thread in docks:
+            thread.join()
+        
+        self.assertFalse([status for _, status in results if status not in (200, 409)])
+        applied = [t for t, status in results if status == 200]
+        quantity, stock_value, transactions = self._product()
+        self.assertEqual(quantity, 5 + applied.count('IN') - applied.count('OUT'))
+        self.assertGreaterEqual(quantity, 0)
+        self.assertEqual(stock_value, quantity * 2.0)
+        self.assertEqual(transactions, len(applied))
+
+
+if __name__ == '__main__':
+    unittest.main()